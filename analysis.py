@@ -1,114 +1,161 @@
-import os
-# Set matplotlib backend before importing matplotlib (fixes Windows backend issues)
-if os.getenv('MPLBACKEND'):
-    import matplotlib
-    matplotlib.use(os.getenv('MPLBACKEND', 'Agg'))
-else:
-    import matplotlib
-    matplotlib.use('Agg')  # Use non-interactive backend for server environments
-
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import joinedload
 from src.app import db
-from src.models import Employee, Skill, SkillGapAnalysis, employee_skills, role_skills
+from src.models import AnalysisJob, Employee, Skill, SkillGapAnalysis, employee_skills
+from src.analysis_jobs import submit_gap_analysis_job
+from src.gap_engine import build_gap_results, run_gap_analysis, score_gaps
+from src.gap_export import EXPORT_FORMATS, build_export_query, parse_date_bound, parse_export_filters, stream_export
+from src.gap_history import gap_trend, record_gap_snapshot
+from src.gap_tracking import clear_marks, delete_unrequired_gaps, latest_mark_id, run_incremental_analysis
+from src.query_budget import exempt_from_query_budget, query_budget
+from src.reference_cache import cached_role, cached_role_requirements, cached_skill, reference_cache
+from src.mentor_matching import mentor_index
+from src.role_fit import rank_role_candidates
+from src.predictions import batch_predictions, count_department_employees
+from src.skill_matrix import skill_matrix
+from src.training_model import adjustment_factors, model_store, predict_training_hours
+from src.upsert import chunked
+from src.versioning import (
+    EMPLOYEES, GAP_HISTORY, SKILL_GAPS, SKILLS, TRAINING_MODEL, bump_versions, conditional_get, current_versions,
+    employee_entity
+)
+from collections import OrderedDict
 from datetime import datetime
-import numpy as np
+import hashlib
+import json
+import threading
 
 analysis_bp = Blueprint('analysis', __name__)
 
+GAP_ENGINES = ('vectorized', 'matrix', 'legacy')
+ANALYSIS_MODES = ('full', 'incremental')
+NDJSON_MIMETYPE = 'application/x-ndjson'
+JOB_PROCESS_NOTE = (
+    'Jobs execute in the API process that accepted them; if that process restarts, '
+    'the job keeps this status and must be resubmitted'
+)
+
+HEATMAP_GROUPINGS = ('skill', 'category')
+HEATMAP_CACHE_SIZE = 32
+_heatmap_cache = OrderedDict()
+_heatmap_lock = threading.Lock()
+
+# SQL-side equivalent of sorting by priority (High first)
+PRIORITY_RANK = case(
+    {'High': 3, 'Medium': 2, 'Low': 1},
+    value=SkillGapAnalysis.priority,
+    else_=0
+)
+
 @analysis_bp.route('/gaps', methods=['POST'])
 def analyze_skill_gaps():
     """Perform skill gap analysis for employees"""
     try:
         data = request.get_json()
         employee_id = data.get('employee_id')
+        engine = data.get('engine', current_app.config.get('GAP_ENGINE', 'vectorized'))
+        mode = data.get('mode', 'full')
         
-        if employee_id:
-            # Analyze specific employee
-            employees = [Employee.query.get_or_404(employee_id)]
-        else:
-            # Analyze all employees
-            employees = Employee.query.all()
+        if engine not in GAP_ENGINES:
+            return jsonify({'error': f"Unknown engine '{engine}', expected one of: {', '.join(GAP_ENGINES)}"}), 400
+        if mode not in ANALYSIS_MODES:
+            return jsonify({'error': f"Unknown mode '{mode}', expected one of: {', '.join(ANALYSIS_MODES)}"}), 400
+        if mode == 'incremental':
+            # Change tracking picks the employees, and they are recomputed with the vectorized engine
+            if employee_id:
+                return jsonify({'error': 'employee_id is not supported in incremental mode'}), 400
+            if data.get('engine', 'vectorized') != 'vectorized':
+                return jsonify({'error': 'Incremental mode supports only the vectorized engine'}), 400
+            engine = 'vectorized'
         
-        results = []
-        for employee in employees:
-            if not employee.role:
-                continue  # Skip employees without assigned roles
+        if data.get('async'):
+            # Run org-wide analysis on the background job pool and return immediately
+            if engine != 'vectorized' or mode != 'full':
+                return jsonify({'error': 'Background jobs support only the vectorized engine in full mode'}), 400
+            if employee_id:
+                Employee.query.get_or_404(employee_id)
             
-            # Get required skills for the employee's role
-            required_skills_query = db.session.query(
-                role_skills.c.skill_id,
-                role_skills.c.required_level
-            ).filter(role_skills.c.role_id == employee.role.id)
+            job = submit_gap_analysis_job(current_app._get_current_object(), employee_id)
+            return jsonify({
+                'message': 'Skill gap analysis job submitted',
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f'/api/analysis/jobs/{job.id}',
+                'results_url': f'/api/analysis/jobs/{job.id}/results'
+            }), 202
+        
+        if _wants_ndjson(data):
+            # Stream rows as they are computed instead of materializing the whole run
+            if engine != 'vectorized' or mode != 'full':
+                return jsonify({'error': 'Streaming supports only the vectorized engine in full mode'}), 400
+            if employee_id:
+                Employee.query.get_or_404(employee_id)
             
-            required_skills = {skill_id: req_level for skill_id, req_level in required_skills_query}
+            return _ndjson_response(_stream_skill_gaps(employee_id))
+        
+        if mode == 'incremental':
+            # Recompute only the (employee, skill) pairs flagged by change tracking. No history
+            # snapshot here: copying the whole gap table would make this O(org) again, and the
+            # changes are captured by the next full run
+            outcome = run_incremental_analysis()
+            db.session.commit()
             
-            for skill_id, required_level in required_skills.items():
-                # Get current skill level for employee
-                current_skill = db.session.execute(
-                    employee_skills.select().where(
-                        (employee_skills.c.employee_id == employee.id) &
-                        (employee_skills.c.skill_id == skill_id)
-                    )
-                ).first()
-                
-                current_level = current_skill.proficiency_level if current_skill else 0
-                gap_score = current_level - required_level
-                
-                # Determine priority based on gap size
-                if gap_score <= -2:
-                    priority = 'High'
-                elif gap_score == -1:
-                    priority = 'Medium'
-                else:
-                    priority = 'Low'
-                
-                # Predict training time (simplified algorithm)
-                predicted_training_time = max(0, abs(gap_score) * 20) if gap_score < 0 else 0
-                
-                # Save or update skill gap analysis
-                existing_analysis = SkillGapAnalysis.query.filter_by(
-                    employee_id=employee.id,
-                    skill_id=skill_id
-                ).first()
-                
-                if existing_analysis:
-                    existing_analysis.current_level = current_level
-                    existing_analysis.required_level = required_level
-                    existing_analysis.gap_score = gap_score
-                    existing_analysis.priority = priority
-                    existing_analysis.predicted_training_time = predicted_training_time
-                    existing_analysis.analysis_date = datetime.utcnow()
-                    gap_analysis = existing_analysis
-                else:
-                    gap_analysis = SkillGapAnalysis(
-                        employee_id=employee.id,
-                        skill_id=skill_id,
-                        current_level=current_level,
-                        required_level=required_level,
-                        gap_score=gap_score,
-                        priority=priority,
-                        predicted_training_time=predicted_training_time
-                    )
-                    db.session.add(gap_analysis)
-                
-                results.append({
-                    'employee_id': employee.id,
-                    'employee_name': f"{employee.first_name} {employee.last_name}",
-                    'skill_id': skill_id,
-                    'skill_name': Skill.query.get(skill_id).name,
-                    'current_level': current_level,
-                    'required_level': required_level,
-                    'gap_score': gap_score,
-                    'priority': priority,
-                    'predicted_training_time': predicted_training_time
-                })
+            results = outcome.pop('results')
+            return jsonify({
+                'message': 'Incremental skill gap analysis completed',
+                'total_gaps_found': len([r for r in results if r['gap_score'] < 0]),
+                **outcome,
+                'results': results
+            })
+        
+        if not employee_id:
+            # A full run refreshes every gap, so pending change marks are consumed
+            clear_marks(latest_mark_id())
         
+        if engine == 'legacy':
+            if employee_id:
+                # Analyze specific employee
+                employees = [Employee.query.get_or_404(employee_id)]
+            else:
+                # Analyze all employees
+                employees = Employee.query.all()
+            
+            analyzed_employees = len(employees)
+            results, rows_inserted, rows_updated = _analyze_skill_gaps_legacy(employees)
+        elif engine == 'matrix':
+            # Read inputs from the in-memory skill matrix instead of SQL
+            if employee_id:
+                Employee.query.get_or_404(employee_id)
+                analyzed_employees = 1
+                inputs = skill_matrix.gap_inputs([employee_id])
+            else:
+                analyzed_employees = len(skill_matrix.snapshot()['employee_ids'])
+                inputs = skill_matrix.gap_inputs()
+            
+            results, rows_inserted, rows_updated = run_gap_analysis(inputs=inputs)
+        else:
+            if employee_id:
+                Employee.query.get_or_404(employee_id)
+                analyzed_employees = 1
+                results, rows_inserted, rows_updated = run_gap_analysis([employee_id])
+            else:
+                analyzed_employees = db.session.query(func.count(Employee.id)).scalar()
+                results, rows_inserted, rows_updated = run_gap_analysis()
+        
+        # Drop gaps for skills a role no longer requires, then append org-wide runs to the gap history
+        rows_deleted = delete_unrequired_gaps([employee_id] if employee_id else None)
+        snapshot = None if employee_id else record_gap_snapshot('full', engine)
         db.session.commit()
         
         return jsonify({
             'message': 'Skill gap analysis completed',
-            'analyzed_employees': len(employees),
+            'analyzed_employees': analyzed_employees,
             'total_gaps_found': len([r for r in results if r['gap_score'] < 0]),
+            'rows_inserted': rows_inserted,
+            'rows_updated': rows_updated,
+            'rows_deleted': rows_deleted,
+            'snapshot_run_id': snapshot.id if snapshot else None,
             'results': results
         })
     
@@ -116,13 +163,212 @@ def analyze_skill_gaps():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _stream_skill_gaps(employee_id=None):
+    """Analyze employees chunk by chunk, yielding each result row and a summary trailer"""
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', 500)
+    
+    try:
+        stmt = select(Employee.id).order_by(Employee.id)
+        up_to_id = None
+        if employee_id:
+            stmt = stmt.where(Employee.id == employee_id)
+        else:
+            # A full run refreshes every gap, so the marks pending now are consumed once every
+            # chunk is written; a client that disconnects midway (GeneratorExit) leaves them
+            up_to_id = latest_mark_id()
+        
+        employee_ids = db.session.execute(stmt).scalars().all()
+        
+        total_gaps_found = rows_inserted = rows_updated = 0
+        for chunk in chunked(employee_ids, chunk_size):
+            results, inserted, updated = run_gap_analysis(chunk)
+            db.session.commit()
+            
+            rows_inserted += inserted
+            rows_updated += updated
+            for result in results:
+                if result['gap_score'] < 0:
+                    total_gaps_found += 1
+                yield _ndjson_line(result)
+        
+        rows_deleted = delete_unrequired_gaps([employee_id] if employee_id else None)
+        snapshot = None
+        if not employee_id:
+            snapshot = record_gap_snapshot('stream', 'vectorized')
+            clear_marks(up_to_id)
+        db.session.commit()
+        
+        yield _ndjson_line({'summary': {
+            'message': 'Skill gap analysis completed',
+            'analyzed_employees': len(employee_ids),
+            'total_gaps_found': total_gaps_found,
+            'rows_inserted': rows_inserted,
+            'rows_updated': rows_updated,
+            'rows_deleted': rows_deleted,
+            'snapshot_run_id': snapshot.id if snapshot else None
+        }})
+    
+    except Exception as e:
+        db.session.rollback()
+        yield _ndjson_line({'error': str(e)})
+
+def _analyze_skill_gaps_legacy(employees):
+    """Row-at-a-time gap analysis, kept selectable for comparison with the vectorized engine"""
+    exempt_from_query_budget()  # Issues per-employee and per-skill statements by design
+    results = []
+    rows_inserted = rows_updated = 0
+    for employee in employees:
+        if not employee.role_id:
+            continue  # Skip employees without assigned roles
+        
+        # Required skills come from the reference cache, loaded once per role
+        required_skills = cached_role_requirements(employee.role_id)
+        
+        for skill_id, required_level in required_skills.items():
+            # Get current skill level for employee
+            current_skill = db.session.execute(
+                employee_skills.select().where(
+                    (employee_skills.c.employee_id == employee.id) &
+                    (employee_skills.c.skill_id == skill_id)
+                )
+            ).first()
+            
+            current_level = current_skill.proficiency_level if current_skill else 0
+            gap_score = current_level - required_level
+            
+            # Determine priority based on gap size
+            if gap_score <= -2:
+                priority = 'High'
+            elif gap_score == -1:
+                priority = 'Medium'
+            else:
+                priority = 'Low'
+            
+            # Predict training time with the deployed model (heuristic fallback without one)
+            predicted_training_time = int(predict_training_hours(
+                [skill_id], [cached_skill(skill_id)['category']], [gap_score]
+            )[0])
+            
+            # Save or update skill gap analysis
+            existing_analysis = SkillGapAnalysis.query.filter_by(
+                employee_id=employee.id,
+                skill_id=skill_id
+            ).first()
+            
+            if existing_analysis:
+                existing_analysis.current_level = current_level
+                existing_analysis.required_level = required_level
+                existing_analysis.gap_score = gap_score
+                existing_analysis.priority = priority
+                existing_analysis.predicted_training_time = predicted_training_time
+                existing_analysis.analysis_date = datetime.utcnow()
+                existing_analysis.job_id = None
+                gap_analysis = existing_analysis
+                rows_updated += 1
+            else:
+                gap_analysis = SkillGapAnalysis(
+                    employee_id=employee.id,
+                    skill_id=skill_id,
+                    current_level=current_level,
+                    required_level=required_level,
+                    gap_score=gap_score,
+                    priority=priority,
+                    predicted_training_time=predicted_training_time
+                )
+                db.session.add(gap_analysis)
+                rows_inserted += 1
+            
+            results.append({
+                'employee_id': employee.id,
+                'employee_name': f"{employee.first_name} {employee.last_name}",
+                'skill_id': skill_id,
+                'skill_name': cached_skill(skill_id)['name'],
+                'current_level': current_level,
+                'required_level': required_level,
+                'gap_score': gap_score,
+                'priority': priority,
+                'predicted_training_time': predicted_training_time
+            })
+    
+    if results:
+        bump_versions(SKILL_GAPS)
+    
+    return results, rows_inserted, rows_updated
+
+@analysis_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """Get status, progress and throughput of a background analysis job"""
+    try:
+        job = AnalysisJob.query.get_or_404(job_id)
+        status = job.to_dict()
+        if job.status in ('Queued', 'Running'):
+            status['note'] = JOB_PROCESS_NOTE
+        return jsonify(status)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/jobs/<job_id>/results', methods=['GET'])
+def get_analysis_job_results(job_id):
+    """Get the gap results written by a background analysis job, page by page"""
+    try:
+        job = AnalysisJob.query.get_or_404(job_id)
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 100, type=int)
+        if page < 1 or per_page < 1:
+            return jsonify({'error': 'page and per_page must be positive integers'}), 400
+        per_page = min(per_page, current_app.config.get('API_MAX_PAGE_SIZE', 1000))
+        
+        query = db.session.query(
+            SkillGapAnalysis, Employee.first_name, Employee.last_name, Skill.name
+        ).join(
+            Employee, Employee.id == SkillGapAnalysis.employee_id
+        ).join(
+            Skill, Skill.id == SkillGapAnalysis.skill_id
+        ).filter(
+            SkillGapAnalysis.job_id == job.id  # Rows rewritten by a later run drop out
+        )
+        
+        rows = query.order_by(
+            SkillGapAnalysis.employee_id, SkillGapAnalysis.skill_id
+        ).offset((page - 1) * per_page).limit(per_page).all()
+        
+        results = [
+            {
+                'employee_id': gap.employee_id,
+                'employee_name': f"{first_name} {last_name}",
+                'skill_id': gap.skill_id,
+                'skill_name': skill_name,
+                'current_level': gap.current_level,
+                'required_level': gap.required_level,
+                'gap_score': int(gap.gap_score) if gap.gap_score is not None else None,  # Same int schema as POST /gaps
+                'priority': gap.priority,
+                'predicted_training_time': gap.predicted_training_time
+            }
+            for gap, first_name, last_name, skill_name in rows
+        ]
+        
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'page': page,
+            'per_page': per_page,
+            'has_more': len(results) == per_page,
+            'results': results
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @analysis_bp.route('/gaps/<int:employee_id>', methods=['GET'])
+@query_budget(max_queries=4)
+@conditional_get(SKILL_GAPS, SKILLS, employee_entity)
 def get_employee_skill_gaps(employee_id):
     """Get skill gap analysis for a specific employee"""
     try:
         employee = Employee.query.get_or_404(employee_id)
         
-        skill_gaps = SkillGapAnalysis.query.filter_by(employee_id=employee_id).all()
+        skill_gaps = SkillGapAnalysis.query.options(
+            joinedload(SkillGapAnalysis.skill)
+        ).filter_by(employee_id=employee_id).all()
         
         gaps_data = []
         for gap in skill_gaps:
@@ -142,25 +388,193 @@ def get_employee_skill_gaps(employee_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@analysis_bp.route('/gaps/<int:employee_id>/live', methods=['GET'])
+@query_budget(max_queries=8)
+def get_employee_live_skill_gaps(employee_id):
+    """Compute an employee's current skill gaps from the in-memory skill matrix"""
+    try:
+        inputs = skill_matrix.gap_inputs([employee_id])
+        if employee_id not in skill_matrix.snapshot()['employee_index']:
+            return jsonify({'error': 'Resource not found'}), 404
+        
+        results = build_gap_results(inputs, score_gaps(
+            inputs['current_level'], inputs['required_level'], inputs['skill_id'], inputs['skill_category']
+        ))
+        
+        return jsonify({
+            'employee_id': employee_id,
+            'skill_gaps': results,
+            'total_gaps': len([g for g in results if g['gap_score'] < 0]),
+            'high_priority_gaps': len([g for g in results if g['priority'] == 'High'])
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/gaps/<int:employee_id>/<int:skill_id>/mentors', methods=['GET'])
+@query_budget(max_queries=8)
+def get_gap_mentors(employee_id, skill_id):
+    """Suggest colleagues strong in a skill and similar in overall profile to mentor an employee"""
+    try:
+        limit = request.args.get('limit', 5, type=int)
+        if limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        limit = min(limit, current_app.config.get('API_MAX_PAGE_SIZE', 1000))
+        
+        match = mentor_index.find_mentors(employee_id, skill_id, limit)
+        if match is None:
+            return jsonify({'error': 'Resource not found'}), 404
+        
+        learner, mentors = match
+        return jsonify({
+            **learner,
+            'min_mentor_level': current_app.config.get('MENTOR_MIN_LEVEL', 4),
+            'mentors': mentors
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/roles/<int:role_id>/candidates', methods=['GET'])
+@query_budget(max_queries=8)
+def get_role_candidates(role_id):
+    """Rank employees by how close they are to meeting a role's skill requirements"""
+    try:
+        top_k = request.args.get('top_k', 10, type=int)
+        if top_k < 1:
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        top_k = min(top_k, current_app.config.get('API_MAX_PAGE_SIZE', 1000))
+        include_current = request.args.get('include_current', 'false').lower() == 'true'
+        
+        # The matrix snapshot decides whether the role exists; the cached role only supplies its details
+        ranking = rank_role_candidates(role_id, top_k, request.args.get('department'), include_current)
+        role = cached_role(role_id) if ranking is not None else None
+        if role is None:
+            return jsonify({'error': 'Resource not found'}), 404
+        
+        candidates, considered = ranking
+        return jsonify({
+            'role': role,
+            'required_skills': len(cached_role_requirements(role_id)),
+            'employees_considered': considered,
+            'top_k': top_k,
+            'candidates': candidates
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get memory footprint and hit/miss statistics of the analytics caches"""
+    return jsonify({
+        'skill_matrix': skill_matrix.stats(),
+        'reference_data': reference_cache.stats(),
+        'training_model': model_store.info(),
+        'mentor_index': mentor_index.stats()
+    })
+
+@analysis_bp.route('/heatmap', methods=['GET'])
+@query_budget(max_queries=4)
+@conditional_get(SKILL_GAPS, SKILLS, EMPLOYEES)
+def get_gap_heatmap():
+    """Get department x skill (or skill category) gap statistics for org-level views"""
+    try:
+        group_by = request.args.get('group_by', 'skill')
+        department = request.args.get('department')
+        
+        if group_by not in HEATMAP_GROUPINGS:
+            return jsonify({'error': f"Unknown group_by '{group_by}', expected one of: {', '.join(HEATMAP_GROUPINGS)}"}), 400
+        
+        # Key the result on the same version counters as the ETag: gap rows, skill names and
+        # categories, and employee departments all shape the cells
+        versions = current_versions([SKILL_GAPS, SKILLS, EMPLOYEES])
+        cache_key = hashlib.sha1(
+            json.dumps([group_by, department, sorted(versions.items())]).encode()
+        ).hexdigest()
+        
+        with _heatmap_lock:
+            cached = _heatmap_cache.get(cache_key)
+            if cached is not None:
+                _heatmap_cache.move_to_end(cache_key)
+                return jsonify(cached)
+        
+        if group_by == 'skill':
+            columns = [Skill.id.label('skill_id'), Skill.name.label('skill_name')]
+        else:
+            columns = [Skill.category.label('skill_category')]
+        
+        query = db.session.query(
+            Employee.department.label('department'),
+            *columns,
+            func.avg(SkillGapAnalysis.gap_score).label('mean_gap'),
+            func.sum(case((SkillGapAnalysis.gap_score < 0, 1), else_=0)).label('below_requirement'),
+            func.sum(SkillGapAnalysis.predicted_training_time).label('total_training_hours'),
+            func.count(SkillGapAnalysis.id).label('analyzed_pairs')
+        ).join(
+            Employee, Employee.id == SkillGapAnalysis.employee_id
+        ).join(
+            Skill, Skill.id == SkillGapAnalysis.skill_id
+        )
+        
+        if department:
+            query = query.filter(Employee.department == department)
+        
+        group_columns = [Employee.department] + [column.element for column in columns]
+        rows = query.group_by(*group_columns).order_by(*group_columns).all()
+        
+        cells = []
+        for row in rows:
+            cell = row._asdict()
+            cell['mean_gap'] = round(float(cell['mean_gap']), 2)
+            cell['below_requirement'] = int(cell['below_requirement'] or 0)
+            cell['total_training_hours'] = int(cell['total_training_hours'] or 0)
+            cells.append(cell)
+        
+        heatmap = {
+            'group_by': group_by,
+            'departments': sorted({cell['department'] for cell in cells}, key=lambda d: (d is None, d or '')),
+            'cells': cells,
+            'cache_key': cache_key
+        }
+        
+        with _heatmap_lock:
+            _heatmap_cache[cache_key] = heatmap
+            while len(_heatmap_cache) > HEATMAP_CACHE_SIZE:
+                _heatmap_cache.popitem(last=False)
+        
+        return jsonify(heatmap)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @analysis_bp.route('/predictions/<int:employee_id>', methods=['GET'])
+@query_budget(max_queries=5)
+@conditional_get(SKILL_GAPS, SKILLS, TRAINING_MODEL, employee_entity)
 def get_skill_predictions(employee_id):
     """Get skill development predictions for an employee"""
     try:
         employee = Employee.query.get_or_404(employee_id)
         
         # Get skill gaps for the employee
-        skill_gaps = SkillGapAnalysis.query.filter_by(employee_id=employee_id).all()
+        skill_gaps = SkillGapAnalysis.query.options(
+            joinedload(SkillGapAnalysis.skill)
+        ).filter_by(employee_id=employee_id).all()
+        
+        # Factors that affect training time: tenure and role level (learned by the model when deployed)
+        role = cached_role(employee.role_id) if employee.role_id else None
+        experience_factor, role_level_factor = adjustment_factors(
+            employee.hire_date, role['level'] if role else None
+        )
+        threshold = current_app.config.get('PREDICTION_THRESHOLD', 0.7)
+        hours_per_week = current_app.config.get('TRAINING_HOURS_PER_WEEK', 8)
         
         predictions = []
         for gap in skill_gaps:
             if gap.gap_score < 0:  # Only predict for skills below required level
-                # Simple prediction model (in real implementation, use trained ML model)
+                # Base time is the model's prediction stored by the last analysis run
                 base_time = gap.predicted_training_time
                 
-                # Factors that affect training time
-                experience_factor = 1.0  # Could be calculated based on hire date
-                role_level_factor = 1.0  # Could be based on role level
-                
                 adjusted_time = base_time * experience_factor * role_level_factor
                 
                 # Success probability (simplified)
@@ -173,24 +587,144 @@ def get_skill_predictions(employee_id):
                     'target_level': gap.required_level,
                     'predicted_training_hours': int(adjusted_time),
                     'success_probability': round(success_probability, 2),
-                    'estimated_completion_weeks': int(adjusted_time / 8),  # Assuming 8 hours per week
+                    'meets_threshold': success_probability >= threshold,
+                    'estimated_completion_weeks': int(adjusted_time / hours_per_week),
                     'priority': gap.priority
                 })
         
         return jsonify({
             'employee_id': employee_id,
             'employee_name': f"{employee.first_name} {employee.last_name}",
+            'experience_factor': experience_factor,
+            'role_level_factor': role_level_factor,
+            'prediction_threshold': threshold,
+            'model': 'trained' if model_store.get() else 'heuristic',
             'predictions': predictions,
             'total_training_hours': sum(p['predicted_training_hours'] for p in predictions),
             'average_success_probability': round(
-                np.mean([p['success_probability'] for p in predictions]) if predictions else 0, 2
+                sum(p['success_probability'] for p in predictions) / len(predictions) if predictions else 0, 2
             )
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@analysis_bp.route('/predictions/batch', methods=['POST'])
+@query_budget(max_queries=2)
+def get_batch_skill_predictions():
+    """Get skill development predictions for a list of employees or a department"""
+    try:
+        data = request.get_json() or {}
+        employee_ids = data.get('employee_ids')
+        department = data.get('department')
+        include_predictions = bool(data.get('include_predictions', False))
+        max_employees = current_app.config.get('PREDICTION_BATCH_MAX_EMPLOYEES', 10000)
+        
+        if (employee_ids is None) == (department is None):
+            return jsonify({'error': 'Provide exactly one of employee_ids or department'}), 400
+        if employee_ids is not None:
+            if not isinstance(employee_ids, list) or not all(
+                isinstance(i, int) and not isinstance(i, bool) for i in employee_ids
+            ):
+                return jsonify({'error': 'employee_ids must be a list of integers'}), 400
+            if len(employee_ids) > max_employees:
+                return jsonify({'error': f'At most {max_employees} employees per request'}), 400
+        else:
+            # Count before loading, so an oversized department never reaches the gap query
+            selected = count_department_employees(department)
+            if selected > max_employees:
+                return jsonify({'error': f'Selection has {selected} employees; at most {max_employees} per request'}), 400
+        
+        employees, total = batch_predictions(employee_ids, department, include_predictions)
+        found_ids = {summary['employee_id'] for summary in employees}
+        
+        for summary in employees + [total]:
+            summary['estimated_cost'] = calculate_training_cost(summary['total_training_hours'])
+        
+        return jsonify({
+            'employees': employees,
+            'missing_employee_ids': [
+                employee_id for employee_id in employee_ids or [] if employee_id not in found_ids
+            ],
+            'total': total,
+            'prediction_threshold': current_app.config.get('PREDICTION_THRESHOLD', 0.7),
+            'model': 'trained' if model_store.get() else 'heuristic'
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/trends/org', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(GAP_HISTORY)
+def get_org_gap_trend():
+    """Get the org-wide gap trajectory across recorded analysis runs"""
+    return _gap_trend_response('org')
+
+@analysis_bp.route('/trends/departments/<department>', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(GAP_HISTORY)
+def get_department_gap_trend(department):
+    """Get one department's gap trajectory across recorded analysis runs"""
+    return _gap_trend_response('department', department)
+
+@analysis_bp.route('/trends/employees/<int:employee_id>', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(GAP_HISTORY)
+def get_employee_gap_trend(employee_id):
+    """Get one employee's gap trajectory across recorded analysis runs"""
+    return _gap_trend_response('employee', employee_id)
+
+def _gap_trend_response(scope, key=''):
+    """Serve trend points for a scope, filtered by date_from/date_to and bucketed by period"""
+    try:
+        period = request.args.get('period', 'run')  # run, day, week, month, quarter
+        date_from = parse_date_bound(request.args.get('date_from'), 'date_from')
+        date_to = parse_date_bound(request.args.get('date_to'), 'date_to', end_of_day=True)
+        
+        points = gap_trend(scope, key, date_from, date_to, period)
+        return jsonify({
+            'scope': scope,
+            'key': key if scope != 'org' else None,
+            'period': period,
+            'points': points,
+            'count': len(points)
+        })
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analysis_bp.route('/export', methods=['GET'])
+@query_budget(max_queries=1)
+def export_skill_gaps():
+    """Stream gap analysis rows with employee, role and skill attributes as Parquet, Arrow IPC or CSV"""
+    try:
+        fmt = request.args.get('format', 'parquet')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        
+        filters = parse_export_filters(request.args)
+        chunk_size = request.args.get('chunk_size', type=int)
+        if chunk_size is not None and chunk_size < 1:
+            return jsonify({'error': 'chunk_size must be a positive integer'}), 400
+        
+        mimetype, extension = EXPORT_FORMATS[fmt]
+        response = Response(
+            stream_with_context(stream_export(build_export_query(**filters), fmt, chunk_size)),
+            mimetype=mimetype
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=skill_gaps.{extension}'
+        return response
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @analysis_bp.route('/recommendations', methods=['POST'])
+@query_budget(max_queries=3)
 def generate_training_recommendations():
     """Generate training recommendations based on skill gap analysis"""
     try:
@@ -198,53 +732,142 @@ def generate_training_recommendations():
         employee_id = data.get('employee_id')
         priority_filter = data.get('priority', 'all')  # 'high', 'medium', 'low', 'all'
         
-        query = SkillGapAnalysis.query
+        if _wants_ndjson(data):
+            return _ndjson_response(_stream_recommendations(employee_id, priority_filter))
         
-        if employee_id:
-            query = query.filter_by(employee_id=employee_id)
+        limit = data.get('top_k', data.get('limit'))
+        offset = data.get('offset', 0)
         
-        if priority_filter != 'all':
-            query = query.filter_by(priority=priority_filter.capitalize())
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            return jsonify({'error': 'limit/top_k must be a positive integer'}), 400
+        if not isinstance(offset, int) or offset < 0:
+            return jsonify({'error': 'offset must be a non-negative integer'}), 400
         
-        # Only get gaps where improvement is needed
-        skill_gaps = query.filter(SkillGapAnalysis.gap_score < 0).all()
+        # Sort by priority and gap size in SQL, loading employee and skill in the same query
+        query = _filter_gaps_needing_training(
+            SkillGapAnalysis.query.options(
+                joinedload(SkillGapAnalysis.employee),
+                joinedload(SkillGapAnalysis.skill)
+            ),
+            employee_id,
+            priority_filter
+        ).order_by(
+            PRIORITY_RANK.desc(), SkillGapAnalysis.gap_score.asc(), SkillGapAnalysis.id
+        )
+        
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
         
         recommendations = []
-        for gap in skill_gaps:
+        for gap in query.all():
             # Generate recommendation based on skill and gap size
-            recommendation = {
-                'employee_id': gap.employee_id,
-                'employee_name': f"{gap.employee.first_name} {gap.employee.last_name}",
-                'skill_id': gap.skill_id,
-                'skill_name': gap.skill.name,
-                'skill_category': gap.skill.category,
-                'current_level': gap.current_level,
-                'target_level': gap.required_level,
-                'gap_size': abs(gap.gap_score),
-                'priority': gap.priority,
-                'training_recommendations': generate_training_suggestions(gap.skill.name, abs(gap.gap_score)),
-                'estimated_duration': gap.predicted_training_time,
-                'cost_estimate': calculate_training_cost(gap.predicted_training_time)
-            }
-            recommendations.append(recommendation)
+            recommendations.append(_build_recommendation(gap, gap.employee, gap.skill))
         
-        # Sort by priority and gap size
-        priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
-        recommendations.sort(
-            key=lambda x: (priority_order[x['priority']], x['gap_size']), 
-            reverse=True
-        )
+        # Totals cover every matching gap, not just the returned page
+        total_recommendations, total_employees, total_hours = _filter_gaps_needing_training(
+            db.session.query(
+                func.count(SkillGapAnalysis.id),
+                func.count(func.distinct(SkillGapAnalysis.employee_id)),
+                func.coalesce(func.sum(SkillGapAnalysis.predicted_training_time), 0)
+            ),
+            employee_id,
+            priority_filter
+        ).one()
         
         return jsonify({
             'recommendations': recommendations,
-            'total_employees_needing_training': len(set(r['employee_id'] for r in recommendations)),
-            'total_estimated_cost': sum(r['cost_estimate'] for r in recommendations),
-            'total_training_hours': sum(r['estimated_duration'] for r in recommendations)
+            'total_recommendations': total_recommendations,
+            'offset': offset,
+            'limit': limit,
+            'total_employees_needing_training': total_employees,
+            'total_estimated_cost': calculate_training_cost(total_hours),
+            'total_training_hours': total_hours
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _filter_gaps_needing_training(query, employee_id, priority_filter):
+    """Restrict a SkillGapAnalysis query to gaps below requirement, with optional filters"""
+    if employee_id:
+        query = query.filter(SkillGapAnalysis.employee_id == employee_id)
+    
+    if priority_filter != 'all':
+        query = query.filter(SkillGapAnalysis.priority == priority_filter.capitalize())
+    
+    # Only get gaps where improvement is needed
+    return query.filter(SkillGapAnalysis.gap_score < 0)
+
+def _build_recommendation(gap, employee, skill):
+    """Build a training recommendation based on skill and gap size"""
+    return {
+        'employee_id': gap.employee_id,
+        'employee_name': f"{employee.first_name} {employee.last_name}",
+        'skill_id': gap.skill_id,
+        'skill_name': skill.name,
+        'skill_category': skill.category,
+        'current_level': gap.current_level,
+        'target_level': gap.required_level,
+        'gap_size': abs(gap.gap_score),
+        'priority': gap.priority,
+        'training_recommendations': generate_training_suggestions(skill.name, abs(gap.gap_score)),
+        'estimated_duration': gap.predicted_training_time,
+        'cost_estimate': calculate_training_cost(gap.predicted_training_time)
+    }
+
+def _stream_recommendations(employee_id, priority_filter):
+    """Yield recommendations from a server-side cursor, followed by a totals trailer"""
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', 500)
+    
+    try:
+        stmt = select(SkillGapAnalysis, Employee, Skill).join(
+            Employee, Employee.id == SkillGapAnalysis.employee_id
+        ).join(
+            Skill, Skill.id == SkillGapAnalysis.skill_id
+        )
+        stmt = _filter_gaps_needing_training(stmt, employee_id, priority_filter).order_by(
+            PRIORITY_RANK.desc(), SkillGapAnalysis.gap_score.asc()
+        ).execution_options(yield_per=chunk_size)
+        
+        employees_needing_training = set()
+        total_estimated_cost = total_training_hours = 0
+        
+        for gap, employee, skill in db.session.execute(stmt):
+            recommendation = _build_recommendation(gap, employee, skill)
+            
+            employees_needing_training.add(gap.employee_id)
+            total_estimated_cost += recommendation['cost_estimate']
+            total_training_hours += recommendation['estimated_duration']
+            yield _ndjson_line(recommendation)
+        
+        yield _ndjson_line({'summary': {
+            'total_employees_needing_training': len(employees_needing_training),
+            'total_estimated_cost': total_estimated_cost,
+            'total_training_hours': total_training_hours
+        }})
+    
+    except Exception as e:
+        yield _ndjson_line({'error': str(e)})
+
+def _wants_ndjson(data):
+    """Check whether the client opted into a streamed NDJSON response"""
+    if data.get('format') == 'ndjson':
+        return True
+    
+    return request.accept_mimetypes.best_match(
+        ['application/json', NDJSON_MIMETYPE]
+    ) == NDJSON_MIMETYPE
+
+def _ndjson_line(record):
+    """Serialize one record as a newline-terminated JSON line"""
+    return json.dumps(record, default=str) + '\n'
+
+def _ndjson_response(records):
+    """Wrap a record generator in a streaming NDJSON response"""
+    return Response(stream_with_context(records), mimetype=NDJSON_MIMETYPE)
+
 def generate_training_suggestions(skill_name, gap_size):
     """Generate training suggestions based on skill and gap size"""
     suggestions = []
@@ -0,0 +1,98 @@
+"""
+Background skill gap analysis jobs.
+
+Jobs run on a bounded in-process thread pool (no external broker). Each job
+walks its employee population in fixed-size chunks, committing results and
+progress after every chunk so status can be polled while it runs. An
+org-wide job consumes the change marks pending when it started, but only in
+the transaction that marks it Completed; a job that fails or dies partway
+leaves them for the next incremental run.
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import select
+from src.app import db
+from src.models import AnalysisJob, Employee
+from src.gap_engine import run_gap_analysis
+from src.gap_history import record_gap_snapshot
+from src.gap_tracking import clear_marks, delete_unrequired_gaps, latest_mark_id
+from src.upsert import chunked
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(app):
+    """Create the shared job pool on first use"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('ANALYSIS_JOB_WORKERS', 2),
+                thread_name_prefix='gap-analysis'
+            )
+
+    return _executor
+
+
+def submit_gap_analysis_job(app, employee_id=None):
+    """Queue a gap analysis job and return it without waiting for completion"""
+    job = AnalysisJob(id=str(uuid.uuid4()), status='Queued', employee_id=employee_id)
+    db.session.add(job)
+    db.session.commit()
+
+    _get_executor(app).submit(_run_job, app, job.id)
+
+    return job
+
+
+def _run_job(app, job_id):
+    """Execute a job inside its own application context"""
+    with app.app_context():
+        try:
+            job = db.session.get(AnalysisJob, job_id)
+
+            stmt = select(Employee.id).order_by(Employee.id)
+            up_to_id = None
+            if job.employee_id:
+                stmt = stmt.where(Employee.id == job.employee_id)
+            else:
+                # A full run refreshes every gap, so the marks pending now are consumed once it completes
+                up_to_id = latest_mark_id()
+
+            employee_ids = db.session.execute(stmt).scalars().all()
+
+            job.status = 'Running'
+            job.started_at = datetime.utcnow()
+            job.total_employees = len(employee_ids)
+            db.session.commit()
+
+            chunk_size = app.config.get('ANALYSIS_JOB_CHUNK_SIZE', 500)
+            for chunk in chunked(employee_ids, chunk_size):
+                _, inserted, updated = run_gap_analysis(chunk, job_id=job.id)
+
+                job.processed_employees += len(chunk)
+                job.rows_inserted += inserted
+                job.rows_updated += updated
+                db.session.commit()
+
+            delete_unrequired_gaps([job.employee_id] if job.employee_id else None)
+            if not job.employee_id:
+                record_gap_snapshot('job', 'vectorized')
+                clear_marks(up_to_id)
+
+            job.status = 'Completed'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(AnalysisJob, job_id)
+            if job:
+                job.status = 'Failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
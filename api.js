@@ -65,6 +65,20 @@ class ApiClient {
         return this.request(`/employees/${employeeId}/skills`);
     }
 
+    async getEmployeeSkillsBatch(employeeIds) {
+        return this.request('/employees/skills/batch', {
+            method: 'POST',
+            body: JSON.stringify({ employee_ids: employeeIds })
+        });
+    }
+
+    async bulkAssessEmployeeSkills(assessments) {
+        return this.request('/employees/skills/assessments', {
+            method: 'POST',
+            body: JSON.stringify({ assessments })
+        });
+    }
+
     async addEmployeeSkill(employeeId, skillData) {
         return this.request(`/employees/${employeeId}/skills`, {
             method: 'POST',
@@ -116,6 +130,24 @@ class ApiClient {
         });
     }
 
+    async submitSkillGapAnalysisJob(employeeId = null) {
+        const body = { async: true };
+        if (employeeId) body.employee_id = employeeId;
+        
+        return this.request('/analysis/gaps', {
+            method: 'POST',
+            body: JSON.stringify(body)
+        });
+    }
+
+    async getAnalysisJob(jobId) {
+        return this.request(`/analysis/jobs/${jobId}`);
+    }
+
+    async getAnalysisJobResults(jobId, page = 1, perPage = 100) {
+        return this.request(`/analysis/jobs/${jobId}/results?page=${page}&per_page=${perPage}`);
+    }
+
     async getEmployeeSkillGaps(employeeId) {
         return this.request(`/analysis/gaps/${employeeId}`);
     }
@@ -124,8 +156,8 @@ class ApiClient {
         return this.request(`/analysis/predictions/${employeeId}`);
     }
 
-    async getTrainingRecommendations(employeeId = null, priority = 'all') {
-        const body = {};
+    async getTrainingRecommendations(employeeId = null, priority = 'all', options = {}) {
+        const body = { ...options };
         if (employeeId) body.employee_id = employeeId;
         if (priority !== 'all') body.priority = priority;
         
@@ -99,8 +99,8 @@ class SkillsGapAnalyzer {
             
             // Load dashboard metrics
             const [employeesData, skillsData] = await Promise.all([
-                apiClient.getEmployees(),
-                apiClient.getSkills()
+                apiClient.getEmployees({ fields: 'id' }),
+                apiClient.getSkills({ fields: 'category' })
             ]);
 
             // Update metrics cards
@@ -132,7 +132,9 @@ class SkillsGapAnalyzer {
     async loadEmployees() {
         try {
             showLoading();
-            const data = await apiClient.getEmployees();
+            const data = await apiClient.getEmployees({
+                fields: 'employee_id,first_name,last_name,email,department,role'
+            });
             this.renderEmployeesTable(data.employees || []);
         } catch (error) {
             console.error('Failed to load employees:', error);
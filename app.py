@@ -8,9 +8,10 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.config import config
+from src.database import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app(config_name=None):
     """Application factory pattern"""
@@ -21,7 +22,10 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     
     # Initialize extensions
+    from src.database import configure_database, install_sqlite_pragmas
+    configure_database(app)
     db.init_app(app)
+    install_sqlite_pragmas(app, db)
     CORS(app)
     
     # Register blueprints
@@ -33,6 +37,14 @@ def create_app(config_name=None):
     app.register_blueprint(skills_bp, url_prefix='/api/skills')
     app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
     
+    # Request latency / SQL metrics and the /metrics endpoint
+    from src.instrumentation import init_metrics
+    init_metrics(app)
+    
+    # Per-request SQL query budgets and N+1 detection
+    from src.query_budget import init_query_budget
+    init_query_budget(app)
+    
     # Health check endpoint
     @app.route('/')
     def health_check():
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark suite for the main API paths.
+
+For each organisation size, generates a deterministic synthetic org, loads
+it into a throwaway SQLite database with the bulk importer, then times gap
+analysis, predictions, recommendations and employee detail through the
+Flask test client. Each path records median/min wall time and the number of
+SQL statements it issued.
+
+Results are written as JSON. When a baseline file is given, any path whose
+median slows down beyond the tolerance, or which issues more SQL statements
+than before, is reported and the script exits with status 1.
+
+Usage:
+    python benchmarks.py --sizes 100 1000 5000 --output results.json
+    python benchmarks.py --save-baseline benchmark_baseline.json
+    python benchmarks.py --baseline benchmark_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+from src.app import create_app, db
+from src.models import Employee
+from src.skill_matrix import skill_matrix
+from config.config import config, TestingConfig
+from bulk_import import BulkImporter
+from synthetic_data import generate_org, write_org
+
+DEFAULT_SIZES = [100, 1000, 5000]
+
+
+class QueryCounter:
+    """Count SQL statements issued on an engine while enabled"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def measure(func, counter, repeat):
+    """Run func repeat times; return timing and query statistics in milliseconds"""
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+        queries = counter.count
+
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'queries': queries
+    }
+
+
+def _request(client, method, url, payload=None):
+    """Issue a request and fail the benchmark on a non-2xx response"""
+    response = client.open(url, method=method, json=payload)
+    if response.status_code >= 300:
+        raise RuntimeError(f'{method} {url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+    return response
+
+
+def benchmark_size(employees, args, work_dir):
+    """Generate, load and time every path for one organisation size"""
+    database_path = os.path.join(work_dir, f'benchmark_{employees}.db')
+    app = create_app_for(database_path)
+
+    skill_records, role_records, employee_records = generate_org(
+        employees=employees,
+        skills=args.skills,
+        roles=args.roles,
+        density=args.density,
+        role_skills=args.role_skills,
+        seed=args.seed
+    )
+    paths = write_org(os.path.join(work_dir, f'org_{employees}'), skill_records, role_records, employee_records)
+
+    results = {}
+    with app.app_context():
+        db.create_all()
+        skill_matrix.invalidate()  # The cache is process-wide; drop matrices from the previous size
+        counter = QueryCounter(db.engine)
+
+        counter.count = 0
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):  # Keep importer progress out of the JSON output
+            importer = BulkImporter(batch_size=args.batch_size, commit_every=args.batch_size * 10)
+            importer.import_skills(paths['skills'])
+            importer.import_roles(paths['roles'])
+            importer.import_employees(paths['employees'])
+        db.session.commit()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        results['loader'] = {
+            'median_ms': elapsed_ms,
+            'min_ms': elapsed_ms,
+            'queries': counter.count,
+            'rows': sum(importer.stats.counts.values())
+        }
+
+        # Probe the employee in the middle of the id range so results stay comparable
+        employee_ids = db.session.query(Employee.id).order_by(Employee.id).all()
+        probe_id = employee_ids[len(employee_ids) // 2][0]
+        db.session.remove()
+
+        client = app.test_client()
+        results['gap_analysis'] = measure(
+            lambda: _request(client, 'POST', '/api/analysis/gaps', {}), counter, args.repeat
+        )
+        results['gap_analysis_employee'] = measure(
+            lambda: _request(client, 'POST', '/api/analysis/gaps', {'employee_id': probe_id}), counter, args.repeat
+        )
+        results['predictions'] = measure(
+            lambda: _request(client, 'GET', f'/api/analysis/predictions/{probe_id}'), counter, args.repeat
+        )
+        results['recommendations'] = measure(
+            lambda: _request(client, 'POST', '/api/analysis/recommendations', {'top_k': 50}), counter, args.repeat
+        )
+        results['employee_detail'] = measure(
+            lambda: _request(client, 'GET', f'/api/employees/{probe_id}'), counter, args.repeat
+        )
+
+        db.session.remove()
+        db.engine.dispose()
+
+    return results
+
+
+def create_app_for(database_path):
+    """Create an app bound to a dedicated SQLite file"""
+    config['benchmark'] = type('BenchmarkConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + database_path,
+        'QUERY_BUDGET_MODE': 'off'  # Time the endpoints without fingerprinting overhead
+    })
+    return create_app('benchmark')
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Return a list of regression messages against a baseline result set"""
+    regressions = []
+
+    for size, paths in results['sizes'].items():
+        baseline_paths = baseline.get('sizes', {}).get(size)
+        if not baseline_paths:
+            continue
+
+        for path, current in paths.items():
+            previous = baseline_paths.get(path)
+            if not previous:
+                continue
+
+            limit = previous['median_ms'] * (1 + tolerance)
+            if current['median_ms'] > limit and current['median_ms'] - previous['median_ms'] > min_delta_ms:
+                regressions.append(
+                    f"{size} employees / {path}: {current['median_ms']:.1f} ms "
+                    f"(baseline {previous['median_ms']:.1f} ms, limit {limit:.1f} ms)"
+                )
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f"{size} employees / {path}: {current['queries']} SQL statements "
+                    f"(baseline {previous['queries']})"
+                )
+
+    return regressions
+
+
+def main():
+    """Parse arguments, run every size and compare against the baseline"""
+    parser = argparse.ArgumentParser(description='Benchmark the main API paths at several organisation sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Employee counts to benchmark')
+    parser.add_argument('--skills', type=int, default=100)
+    parser.add_argument('--roles', type=int, default=20)
+    parser.add_argument('--density', type=float, default=0.15, help='Fraction of skills rated per employee')
+    parser.add_argument('--role-skills', type=int, default=8, help='Required skills per role')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Loader rows per executemany batch')
+    parser.add_argument('--output', help='Write results JSON here instead of stdout')
+    parser.add_argument('--baseline', help='Baseline results JSON to compare against')
+    parser.add_argument('--save-baseline', help='Also write the results as a new baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed median slowdown (0.5 = 50%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args()
+
+    results = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'skills': args.skills,
+            'roles': args.roles,
+            'density': args.density,
+            'role_skills': args.role_skills,
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'sizes': {}
+    }
+
+    work_dir = tempfile.mkdtemp(prefix='skills_gap_benchmark_')
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} employees...", file=sys.stderr)
+            results['sizes'][str(size)] = benchmark_size(size, args, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Saved baseline to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        if baseline.get('parameters') != results['parameters']:
+            print("Warning: baseline was recorded with different parameters", file=sys.stderr)
+
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\nPERFORMANCE REGRESSIONS:", file=sys.stderr)
+            for message in regressions:
+                print(f"  - {message}", file=sys.stderr)
+            sys.exit(1)
+
+        print("No performance regressions against baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+High-volume bulk importer for skills, roles and employees.
+
+Streams JSON arrays, JSON Lines or CSV input, resolves skill names and role
+titles through dictionaries preloaded once, and writes rows with batched
+executemany calls and periodic commits. Core inserts bypass the ORM change
+listeners, so each batch also writes its gap recompute marks (imported
+employees, roles with requirements) for the next incremental analysis.
+Prints a rows/sec report at the end.
+
+Usage:
+    python bulk_import.py --skills skills.json --roles roles.json --employees hris_export.csv
+
+CSV layouts (skill lists use "Skill Name:level" pairs separated by ";"):
+    skills:    name,category,description
+    roles:     title,description,department,level,required_skills
+    employees: employee_id,first_name,last_name,email,department,hire_date,role,skills
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, select
+from src.app import create_app, db
+from src.models import Employee, Skill, Role, employee_skills, role_skills
+from src.gap_tracking import mark_employees_stale, mark_roles_stale
+from src.versioning import EMPLOYEES, SKILL_MATRIX, SKILLS, bump_versions
+
+
+def iter_json_array(path, buffer_size=1 << 16):
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(buffer_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f'{path} does not contain a JSON array')
+        buffer = buffer[1:]
+        eof = False
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(buffer_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            yield item
+            buffer = buffer[end:]
+
+            if len(buffer) < buffer_size and not eof:
+                chunk = f.read(buffer_size)
+                eof = not chunk
+                buffer += chunk
+
+
+def iter_json_lines(path):
+    """Yield one record per non-empty line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def parse_skill_list(value, level_key):
+    """Parse "Python:4;SQL:3" into [{'skill_name': 'Python', level_key: 4}, ...]"""
+    skills = []
+    for item in (value or '').split(';'):
+        if not item.strip():
+            continue
+        name, _, level = item.rpartition(':')
+        skills.append({'skill_name': name.strip(), level_key: int(level)})
+    return skills
+
+
+def iter_csv(path, list_column=None, level_key=None):
+    """Yield CSV rows as dicts, expanding an optional skill list column"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            if list_column:
+                row[list_column] = parse_skill_list(row.get(list_column), level_key)
+            yield row
+
+
+def iter_records(path, list_column=None, level_key=None):
+    """Pick a streaming reader from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.csv':
+        return iter_csv(path, list_column, level_key)
+    if extension in ('.jsonl', '.ndjson'):
+        return iter_json_lines(path)
+    return iter_json_array(path)
+
+
+def batched(records, batch_size):
+    """Group a record stream into lists of batch_size"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportStats:
+    """Row counters and timing for the final report"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counts = {}
+
+    def add(self, name, count):
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+
+        print("\n" + "=" * 50)
+        print("BULK IMPORT SUMMARY")
+        print("=" * 50)
+        for name, count in self.counts.items():
+            print(f"{name:<24}{count:>12,}")
+        print("-" * 50)
+        print(f"{'Total rows':<24}{total:>12,}")
+        print(f"{'Elapsed seconds':<24}{elapsed:>12.2f}")
+        print(f"{'Rows/sec':<24}{(total / elapsed if elapsed else 0):>12,.0f}")
+        print("=" * 50)
+
+
+class BulkImporter:
+    """Batched loader backed by preloaded name -> id dictionaries"""
+
+    def __init__(self, batch_size=5000, commit_every=50000):
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.pending = 0
+        self.stats = ImportStats()
+
+        self.skill_ids = dict(db.session.execute(select(Skill.name, Skill.id)).all())
+        self.role_ids = {}
+        for title, role_id in db.session.execute(select(Role.title, Role.id).order_by(Role.id)):
+            self.role_ids.setdefault(title, role_id)  # First role wins, like filter_by().first()
+        self.employee_keys = set(db.session.execute(select(Employee.employee_id)).scalars())
+        self.emails = set(db.session.execute(select(Employee.email)).scalars())
+
+    def _written(self, count):
+        """Commit once enough rows have accumulated"""
+        self.pending += count
+        if self.pending >= self.commit_every:
+            db.session.commit()
+            self.pending = 0
+
+    def import_skills(self, path):
+        print(f"Importing skills from {path}...")
+        table = Skill.__table__
+
+        for batch in batched(iter_records(path), self.batch_size):
+            rows = []
+            for record in batch:
+                if record['name'] in self.skill_ids:
+                    continue
+                self.skill_ids[record['name']] = None  # Reserve to skip in-file duplicates
+                rows.append({
+                    'name': record['name'],
+                    'category': record.get('category'),
+                    'description': record.get('description')
+                })
+            if not rows:
+                continue
+
+            inserted = db.session.execute(
+                insert(table).returning(table.c.id, table.c.name, sort_by_parameter_order=True), rows
+            ).all()
+            self.skill_ids.update({name: skill_id for skill_id, name in inserted})
+            self.stats.add('skills', len(rows))
+            self._written(len(rows))
+
+    def import_roles(self, path):
+        print(f"Importing roles from {path}...")
+        table = Role.__table__
+
+        for batch in batched(iter_records(path, 'required_skills', 'required_level'), self.batch_size):
+            records = []
+            for record in batch:
+                if record['title'] in self.role_ids:
+                    continue
+                self.role_ids[record['title']] = None  # Reserve to skip in-file duplicates
+                records.append(record)
+            if not records:
+                continue
+            batch = records
+
+            inserted = db.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'title': record['title'],
+                        'description': record.get('description'),
+                        'department': record.get('department'),
+                        'level': record.get('level')
+                    }
+                    for record in batch
+                ]
+            ).scalars().all()
+
+            requirement_rows = []
+            for role_id, record in zip(inserted, batch):
+                self.role_ids[record['title']] = role_id
+                for skill_req in record.get('required_skills') or []:
+                    skill_id = self.skill_ids.get(skill_req['skill_name'])
+                    if skill_id:
+                        requirement_rows.append({
+                            'role_id': role_id,
+                            'skill_id': skill_id,
+                            'required_level': int(skill_req['required_level'])
+                        })
+
+            if requirement_rows:
+                db.session.execute(insert(role_skills), requirement_rows)
+                mark_roles_stale(sorted({row['role_id'] for row in requirement_rows}))
+
+            self.stats.add('roles', len(batch))
+            self.stats.add('role requirements', len(requirement_rows))
+            self._written(len(batch) + len(requirement_rows))
+
+    def import_employees(self, path):
+        print(f"Importing employees from {path}...")
+        table = Employee.__table__
+
+        for batch in batched(iter_records(path, 'skills', 'proficiency_level'), self.batch_size):
+            records = []
+            for record in batch:
+                if record['employee_id'] in self.employee_keys or record['email'] in self.emails:
+                    continue
+                self.employee_keys.add(record['employee_id'])
+                self.emails.add(record['email'])
+                records.append(record)
+            if not records:
+                continue
+
+            now = datetime.utcnow()
+            inserted = db.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'employee_id': record['employee_id'],
+                        'first_name': record['first_name'],
+                        'last_name': record['last_name'],
+                        'email': record['email'],
+                        'department': record.get('department') or None,
+                        'hire_date': date.fromisoformat(record['hire_date']) if record.get('hire_date') else None,
+                        'role_id': self.role_ids.get(record.get('role')),
+                        'created_at': now,
+                        'updated_at': now
+                    }
+                    for record in records
+                ]
+            ).scalars().all()
+
+            skill_rows = []
+            for employee_pk, record in zip(inserted, records):
+                for skill_data in record.get('skills') or []:
+                    skill_id = self.skill_ids.get(skill_data['skill_name'])
+                    if skill_id:
+                        skill_rows.append({
+                            'employee_id': employee_pk,
+                            'skill_id': skill_id,
+                            'proficiency_level': int(skill_data['proficiency_level']),
+                            'assessed_date': now
+                        })
+
+            if skill_rows:
+                db.session.execute(insert(employee_skills), skill_rows)
+            mark_employees_stale(inserted)
+
+            self.stats.add('employees', len(records))
+            self.stats.add('employee skills', len(skill_rows))
+            self._written(len(records) + len(skill_rows))
+
+    def finish(self):
+        if self.stats.counts:
+            bump_versions(SKILLS, EMPLOYEES, SKILL_MATRIX)  # Invalidate cached list ETags and skill matrices
+        db.session.commit()
+        self.stats.report()
+
+
+def main():
+    """Parse arguments and run the import in dependency order"""
+    parser = argparse.ArgumentParser(description='Bulk import skills, roles and employees')
+    parser.add_argument('--skills', help='Skills file (.json, .jsonl/.ndjson or .csv)')
+    parser.add_argument('--roles', help='Roles file (.json, .jsonl/.ndjson or .csv)')
+    parser.add_argument('--employees', help='Employees file (.json, .jsonl/.ndjson or .csv)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per executemany batch')
+    parser.add_argument('--commit-every', type=int, default=50000, help='Rows written between commits')
+    parser.add_argument('--config', default=None, help='Configuration name (development, production, testing)')
+    args = parser.parse_args()
+
+    if not (args.skills or args.roles or args.employees):
+        parser.error('Provide at least one of --skills, --roles or --employees')
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        db.create_all()
+
+        importer = BulkImporter(batch_size=args.batch_size, commit_every=args.commit_every)
+
+        # Load data in order of dependencies
+        if args.skills:
+            importer.import_skills(args.skills)
+        if args.roles:
+            importer.import_roles(args.roles)
+        if args.employees:
+            importer.import_employees(args.employees)
+
+        importer.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Retention and compaction job for the gap history.
+
+Deletes raw GapSnapshot rows older than GAP_HISTORY_RAW_RETENTION_DAYS
+(their trend aggregates are kept) and thins runs older than
+GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS to the last run of each
+GAP_HISTORY_DOWNSAMPLE_PERIOD. Meant to run from cron after analysis runs.
+
+Usage:
+    python compact_gap_history.py --dry-run
+    python compact_gap_history.py --raw-retention-days 30 --downsample-after-days 90 --period quarter
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.app import create_app, db
+from src.gap_history import TREND_PERIODS, compact_gap_history
+
+
+def main():
+    """Parse arguments and compact the gap history"""
+    parser = argparse.ArgumentParser(description='Downsample old gap snapshot runs and drop expired raw rows')
+    parser.add_argument('--raw-retention-days', type=int, help='Override GAP_HISTORY_RAW_RETENTION_DAYS')
+    parser.add_argument('--downsample-after-days', type=int, help='Override GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS')
+    parser.add_argument('--period', choices=TREND_PERIODS[1:], help='Override GAP_HISTORY_DOWNSAMPLE_PERIOD')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be removed without deleting')
+    parser.add_argument('--config', default=None, help='Configuration name (development, production, testing)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        db.create_all()
+
+        stats = compact_gap_history(
+            raw_retention_days=args.raw_retention_days,
+            downsample_after_days=args.downsample_after_days,
+            downsample_period=args.period,
+            dry_run=args.dry_run
+        )
+        db.session.commit()
+
+    print("=" * 50)
+    print("GAP HISTORY COMPACTION" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    print(f"{'Runs removed':<28}{stats['runs_removed']:>12,}")
+    print(f"{'Runs with raw rows dropped':<28}{stats['runs_raw_dropped']:>12,}")
+    print(f"{'Raw rows deleted':<28}{stats['raw_rows_deleted']:>12,}")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,14 +11,57 @@ class Config:
     
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///skills_gap_analyzer.db'
+    READ_REPLICA_URL = os.environ.get('READ_REPLICA_URL')  # Optional read-only bind for GET requests
+    
+    # Connection Pool Configuration (pool sizing applies to server databases only)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # Seconds, -1 = never
+    DB_POOL_PRE_PING = (os.environ.get('DB_POOL_PRE_PING') or 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS') or 30000)  # PostgreSQL only, 0 = no limit
+    SQLITE_WAL = (os.environ.get('SQLITE_WAL') or 'true').lower() == 'true'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
     
     # API Configuration
     API_HOST = os.environ.get('API_HOST') or 'localhost'
     API_PORT = int(os.environ.get('API_PORT') or 5000)
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE') or 1000)  # Upper bound for ?limit=
     
     # Machine Learning Configuration
     MODEL_PATH = os.environ.get('MODEL_PATH') or 'models/'
-    PREDICTION_THRESHOLD = float(os.environ.get('PREDICTION_THRESHOLD') or 0.7)
+    PREDICTION_THRESHOLD = float(os.environ.get('PREDICTION_THRESHOLD') or 0.7)  # Minimum success probability to flag
+    MODEL_RELOAD_INTERVAL = int(os.environ.get('MODEL_RELOAD_INTERVAL') or 30)  # Seconds between model file mtime checks
+    TRAINING_HOURS_PER_WEEK = int(os.environ.get('TRAINING_HOURS_PER_WEEK') or 8)
+    PREDICTION_BATCH_MAX_EMPLOYEES = int(os.environ.get('PREDICTION_BATCH_MAX_EMPLOYEES') or 10000)  # Per batch request
+    MENTOR_MIN_LEVEL = int(os.environ.get('MENTOR_MIN_LEVEL') or 4)  # Proficiency needed to mentor a skill
+    MENTOR_CANDIDATE_POOL = int(os.environ.get('MENTOR_CANDIDATE_POOL') or 50)  # Nearest neighbours re-ranked per lookup
+    MENTOR_DEPARTMENT_BONUS = float(os.environ.get('MENTOR_DEPARTMENT_BONUS') or 0.1)  # Added to same-department similarity
+    
+    # Analysis Configuration
+    GAP_ENGINE = os.environ.get('GAP_ENGINE') or 'vectorized'  # vectorized, legacy
+    GAP_UPSERT_CHUNK_SIZE = int(os.environ.get('GAP_UPSERT_CHUNK_SIZE') or 1000)
+    ANALYSIS_JOB_WORKERS = int(os.environ.get('ANALYSIS_JOB_WORKERS') or 2)
+    ANALYSIS_JOB_CHUNK_SIZE = int(os.environ.get('ANALYSIS_JOB_CHUNK_SIZE') or 500)  # Employees per commit
+    STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE') or 500)  # Rows/employees per NDJSON batch
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE') or 50000)  # Rows per Parquet/Arrow/CSV export batch
+    GAP_SNAPSHOTS_ENABLED = (os.environ.get('GAP_SNAPSHOTS_ENABLED') or 'true').lower() == 'true'  # History of org-wide runs
+    GAP_SNAPSHOT_RAW_ROWS = (os.environ.get('GAP_SNAPSHOT_RAW_ROWS') or 'false').lower() == 'true'  # Also copy every gap row per run
+    GAP_HISTORY_RAW_RETENTION_DAYS = int(os.environ.get('GAP_HISTORY_RAW_RETENTION_DAYS') or 90)  # Raw snapshot rows; aggregates stay
+    GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS = int(os.environ.get('GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS') or 180)
+    GAP_HISTORY_DOWNSAMPLE_PERIOD = os.environ.get('GAP_HISTORY_DOWNSAMPLE_PERIOD') or 'month'  # day, week, month, quarter
+    SKILL_MATRIX_TTL = int(os.environ.get('SKILL_MATRIX_TTL') or 0)  # Seconds, 0 = until the skill_matrix version changes
+    REFERENCE_CACHE_SIZE = int(os.environ.get('REFERENCE_CACHE_SIZE') or 1024)  # Cached skills/roles/requirements entries
+    REFERENCE_CACHE_TTL = int(os.environ.get('REFERENCE_CACHE_TTL') or 300)  # Seconds
+    ASSESSMENT_MAX_ROWS = int(os.environ.get('ASSESSMENT_MAX_ROWS') or 50000)  # Ratings per bulk request
+    ASSESSMENT_UPSERT_CHUNK_SIZE = int(os.environ.get('ASSESSMENT_UPSERT_CHUNK_SIZE') or 1000)
+    
+    # Instrumentation Configuration
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() == 'true'
+    METRICS_RESPONSE_HEADER = (os.environ.get('METRICS_RESPONSE_HEADER') or 'false').lower() == 'true'  # X-Request-Metrics
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or 'off'  # off, log (staging), raise (tests)
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD') or 10)  # Allowed repeats of one statement shape
+    STARTUP_TIME_BUDGET_MS = int(os.environ.get('STARTUP_TIME_BUDGET_MS') or 1500)  # create_app() cold start, see startup_profile.py
     
     # Logging Configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
@@ -28,16 +71,27 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     FLASK_ENV = 'development'
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 2)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 3)
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     FLASK_ENV = 'production'
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 900)
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS') or 15000)
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
+    QUERY_BUDGET_MODE = 'raise'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test_skills_gap_analyzer.db'
+    READ_REPLICA_URL = os.environ.get('TEST_READ_REPLICA_URL')  # e.g. sqlite:///test_skills_gap_analyzer_replica.db
+    DB_POOL_SIZE = 1
+    DB_MAX_OVERFLOW = 0
+    DB_POOL_PRE_PING = False
 
 # Configuration dictionary
 config = {
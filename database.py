@@ -0,0 +1,149 @@
+"""
+Engine tuning and read/write session routing.
+
+``configure_database`` turns the DB_* settings of the active config class
+into SQLAlchemy engine options (pool sizing, recycle, pre-ping and a
+PostgreSQL statement timeout) and registers READ_REPLICA_URL as the
+``replica`` bind. ``RoutingSession`` sends GET/HEAD requests of the
+read-heavy blueprints to that bind; everything else, including any flush,
+stays on the primary. Process-wide caches load inside ``primary_reads()``,
+so a lagging replica never ends up cached and reused by later writes.
+SQLite engines get WAL and busy_timeout pragmas on connect, and a SQLite
+replica is opened query-only.
+"""
+import sqlite3
+from contextlib import contextmanager
+import click
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+REPLICA_BLUEPRINTS = ('analysis', 'employees', 'skills')
+
+
+def read_from_primary():
+    """Pin the rest of the current request to the primary (read-your-writes)"""
+    if has_request_context():
+        g.read_from_primary = True
+
+
+@contextmanager
+def primary_reads():
+    """Route the statements issued inside the block to the primary"""
+    if not has_request_context():
+        yield
+        return
+
+    previous = g.get('read_from_primary', False)
+    g.read_from_primary = True
+    try:
+        yield
+    finally:
+        g.read_from_primary = previous
+
+
+def _use_replica():
+    return (
+        has_request_context()
+        and request.method in READ_METHODS
+        and request.blueprint in REPLICA_BLUEPRINTS
+        and not g.get('read_from_primary')
+    )
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica bind during read-only API requests"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def engine_options(url, config):
+    """Build create_engine() options for url from the DB_* settings of a config"""
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE']
+    }
+
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        return options  # SQLite picks its own pool class; sizing options do not apply
+
+    options.update({
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT']
+    })
+    if backend == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+
+    return options
+
+
+def _sqlite_pragmas(wal, busy_timeout_ms, query_only):
+    """Return a connect listener applying the SQLite pragmas"""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+        if wal:
+            cursor.execute('PRAGMA journal_mode = WAL')
+            cursor.execute('PRAGMA synchronous = NORMAL')  # Durable enough with WAL, far fewer fsyncs
+        if query_only:
+            cursor.execute('PRAGMA query_only = ON')
+        cursor.close()
+
+    return on_connect
+
+
+def configure_database(app):
+    """Fill in engine options and the replica bind before db.init_app(app)"""
+    config = app.config
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], config))
+
+    replica_url = config.get('READ_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = {'url': replica_url, **engine_options(replica_url, config)}
+        config['SQLALCHEMY_BINDS'] = binds
+
+    @app.cli.command('sync-replica')
+    def sync_replica_command():
+        """Copy the SQLite primary into the READ_REPLICA_URL file"""
+        if not replica_url:
+            raise click.ClickException('READ_REPLICA_URL is not set')
+        sync_sqlite_replica(config['SQLALCHEMY_DATABASE_URI'], replica_url)
+        click.echo(f'Replica refreshed: {replica_url}')
+
+
+def install_sqlite_pragmas(app, db):
+    """Attach the pragma listener to every SQLite engine of the app (after db.init_app)"""
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _sqlite_pragmas(
+                    wal=app.config.get('SQLITE_WAL', True),
+                    busy_timeout_ms=app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+                    query_only=key == REPLICA_BIND
+                ))
+
+
+def sync_sqlite_replica(primary_url, replica_url):
+    """Copy a SQLite primary into the replica file (local stand-in for replication)"""
+    primary_path = make_url(primary_url).database
+    replica_path = make_url(replica_url).database
+
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
@@ -1,61 +1,82 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, render_template
+from sqlalchemy import select
 from src.app import db
 from src.models import Employee, Role, Skill, employee_skills
+from src.gap_tracking import mark_employee_skill_stale, mark_employee_stale, mark_pairs_stale
+from src.pagination import keyset_page, next_cursor, parse_fields
+from src.query_budget import query_budget
+from src.skill_matrix import skill_matrix
+from src.upsert import chunked, upsert_chunk
+from src.versioning import EMPLOYEES, SKILL_MATRIX, SKILLS, bump_versions, conditional_get, employee_entity
+from sqlalchemy.orm import joinedload, load_only
 from datetime import datetime
 
 employees_bp = Blueprint('employees', __name__)
 
-@app.route('/sikll gap analyze')
+EMPLOYEE_FIELDS = (
+    'id', 'employee_id', 'first_name', 'last_name', 'email', 'department',
+    'hire_date', 'role', 'created_at', 'updated_at'
+)
+
+@employees_bp.route('/skill-gap', methods=['GET'])
 def start():
+    """Serve the employee skill gap page"""
     return render_template('skills_gap_employee.html')
     
 
 @employees_bp.route('', methods=['GET'])
+@query_budget(max_queries=3)
+@conditional_get(EMPLOYEES)
 def get_employees():
     """Get all employees with optional filtering"""
     try:
         department = request.args.get('department')
         role_id = request.args.get('role_id')
+        fields = parse_fields(request.args.get('fields'), EMPLOYEE_FIELDS)
         
         query = Employee.query
         
+        if fields is None or 'role' in fields:
+            # Join the role up front instead of lazy-loading it per employee
+            query = query.options(joinedload(Employee.role))
+        if fields is not None:
+            query = query.options(load_only(
+                *[getattr(Employee, field) for field in fields if field != 'role']
+            ))
+        
         if department:
             query = query.filter(Employee.department == department)
         if role_id:
             query = query.filter(Employee.role_id == role_id)
         
+        query, limit = keyset_page(
+            query, Employee.id,
+            after_id=request.args.get('after_id', type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        
         employees = query.all()
         return jsonify({
-            'employees': [employee.to_dict() for employee in employees],
-            'count': len(employees)
+            'employees': [employee.to_dict(fields) for employee in employees],
+            'count': len(employees),
+            'next_after_id': next_cursor(employees, limit)
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route('/<int:employee_id>', methods=['GET'])
+@query_budget(max_queries=3)
+@conditional_get(SKILLS, employee_entity)
 def get_employee(employee_id):
     """Get a specific employee by ID"""
     try:
-        employee = Employee.query.get_or_404(employee_id)
+        employee = Employee.query.options(joinedload(Employee.role)).get_or_404(employee_id)
         
         # Get employee's skills with proficiency levels
-        skills_data = []
-        for skill in employee.skills:
-            # Get proficiency level from association table
-            result = db.session.execute(
-                employee_skills.select().where(
-                    (employee_skills.c.employee_id == employee_id) &
-                    (employee_skills.c.skill_id == skill.id)
-                )
-            ).first()
-            
-            skill_data = skill.to_dict()
-            skill_data['proficiency_level'] = result.proficiency_level if result else None
-            skill_data['assessed_date'] = result.assessed_date.isoformat() if result and result.assessed_date else None
-            skills_data.append(skill_data)
-        
         employee_data = employee.to_dict()
-        employee_data['skills'] = skills_data
+        employee_data['skills'] = _skill_profiles([employee_id])[employee_id]
         
         return jsonify(employee_data)
     except Exception as e:
@@ -94,7 +115,15 @@ def create_employee():
         )
         
         db.session.add(employee)
+        
+        if employee.role_id:
+            db.session.flush()  # Flush to get the ID
+            mark_employee_stale(employee.id)
+        
+        db.session.flush()
+        bump_versions(EMPLOYEES, SKILL_MATRIX, employee_entity(employee.id))
         db.session.commit()
+        skill_matrix.invalidate()
         
         return jsonify(employee.to_dict()), 201
     except Exception as e:
@@ -108,6 +137,11 @@ def update_employee(employee_id):
         employee = Employee.query.get_or_404(employee_id)
         data = request.get_json()
         
+        # A role change invalidates every stored gap for this employee
+        role_changed = 'role_id' in data and data['role_id'] != employee.role_id
+        if role_changed:
+            mark_employee_stale(employee.id)
+        
         # Update fields if provided
         for field in ['first_name', 'last_name', 'email', 'department', 'role_id']:
             if field in data:
@@ -118,7 +152,18 @@ def update_employee(employee_id):
         
         employee.updated_at = datetime.utcnow()
         
+        profile_changed = 'first_name' in data or 'last_name' in data or 'department' in data
+        entities = [EMPLOYEES, employee_entity(employee.id)]
+        if profile_changed or role_changed:
+            entities.append(SKILL_MATRIX)  # Names, departments and roles are held by the skill matrix
+        bump_versions(*entities)
         db.session.commit()
+        
+        if profile_changed:
+            skill_matrix.invalidate()  # Cached display names and departments are stale
+        elif role_changed:
+            skill_matrix.patch_employee_role(employee.id, employee.role_id)
+        
         return jsonify(employee.to_dict())
     except Exception as e:
         db.session.rollback()
@@ -130,31 +175,23 @@ def delete_employee(employee_id):
     try:
         employee = Employee.query.get_or_404(employee_id)
         db.session.delete(employee)
+        bump_versions(EMPLOYEES, SKILL_MATRIX, employee_entity(employee_id))
         db.session.commit()
+        skill_matrix.invalidate()
         return jsonify({'message': 'Employee deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @employees_bp.route('/<int:employee_id>/skills', methods=['GET'])
+@query_budget(max_queries=3)
+@conditional_get(SKILLS, employee_entity)
 def get_employee_skills(employee_id):
     """Get all skills for a specific employee"""
     try:
-        employee = Employee.query.get_or_404(employee_id)
+        Employee.query.get_or_404(employee_id)
         
-        skills_data = []
-        for skill in employee.skills:
-            result = db.session.execute(
-                employee_skills.select().where(
-                    (employee_skills.c.employee_id == employee_id) &
-                    (employee_skills.c.skill_id == skill.id)
-                )
-            ).first()
-            
-            skill_data = skill.to_dict()
-            skill_data['proficiency_level'] = result.proficiency_level if result else None
-            skill_data['assessed_date'] = result.assessed_date.isoformat() if result and result.assessed_date else None
-            skills_data.append(skill_data)
+        skills_data = _skill_profiles([employee_id])[employee_id]
         
         return jsonify({
             'employee_id': employee_id,
@@ -164,6 +201,183 @@ def get_employee_skills(employee_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@employees_bp.route('/skills/batch', methods=['POST'])
+@query_budget(max_queries=2)
+def get_employee_skills_batch():
+    """Get skill profiles for many employees in a single request"""
+    try:
+        data = request.get_json()
+        employee_ids = data.get('employee_ids')
+        
+        if not isinstance(employee_ids, list) or not employee_ids:
+            return jsonify({'error': 'employee_ids must be a non-empty list'}), 400
+        
+        max_ids = current_app.config.get('API_MAX_PAGE_SIZE', 1000)
+        if len(employee_ids) > max_ids:
+            return jsonify({'error': f'At most {max_ids} employee_ids per request'}), 400
+        
+        employee_ids = list(dict.fromkeys(employee_ids))  # Drop duplicates, keep order
+        found_ids = set(db.session.execute(
+            select(Employee.id).where(Employee.id.in_(employee_ids))
+        ).scalars())
+        
+        profiles = _skill_profiles([employee_id for employee_id in employee_ids if employee_id in found_ids])
+        
+        return jsonify({
+            'profiles': [
+                {
+                    'employee_id': employee_id,
+                    'skills': profiles[employee_id],
+                    'count': len(profiles[employee_id])
+                }
+                for employee_id in employee_ids if employee_id in found_ids
+            ],
+            'missing_employee_ids': [employee_id for employee_id in employee_ids if employee_id not in found_ids],
+            'count': len(found_ids)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@employees_bp.route('/skills/assessments', methods=['POST'])
+def bulk_assess_employee_skills():
+    """Upsert many (employee_id, skill_id, proficiency_level) ratings in one request"""
+    try:
+        data = request.get_json()
+        assessments = data.get('assessments')
+        
+        if not isinstance(assessments, list) or not assessments:
+            return jsonify({'error': 'assessments must be a non-empty list'}), 400
+        
+        max_rows = current_app.config.get('ASSESSMENT_MAX_ROWS', 50000)
+        if len(assessments) > max_rows:
+            return jsonify({'error': f'At most {max_rows} assessments per request'}), 400
+        
+        outcomes = [None] * len(assessments)
+        candidates = {}  # (employee_id, skill_id) -> index of the last rating for the pair
+        for index, item in enumerate(assessments):
+            error = _validate_assessment(item)
+            if error:
+                outcomes[index] = _assessment_outcome(assessments, index, 'invalid', error)
+                continue
+            
+            key = (item['employee_id'], item['skill_id'])
+            if key in candidates:
+                previous = candidates[key]
+                outcomes[previous] = _assessment_outcome(
+                    assessments, previous, 'superseded', 'Overridden by a later rating for the same pair'
+                )
+            candidates[key] = index
+        
+        # Validate referenced ids with one query per table
+        known_employees = set(db.session.execute(
+            select(Employee.id).where(Employee.id.in_({key[0] for key in candidates}))
+        ).scalars())
+        known_skills = set(db.session.execute(
+            select(Skill.id).where(Skill.id.in_({key[1] for key in candidates}))
+        ).scalars())
+        
+        assessed_date = datetime.utcnow()
+        rows = []
+        for (employee_id, skill_id), index in candidates.items():
+            if employee_id not in known_employees:
+                outcomes[index] = _assessment_outcome(assessments, index, 'invalid', 'Unknown employee_id')
+            elif skill_id not in known_skills:
+                outcomes[index] = _assessment_outcome(assessments, index, 'invalid', 'Unknown skill_id')
+            else:
+                rows.append({
+                    'employee_id': employee_id,
+                    'skill_id': skill_id,
+                    'proficiency_level': assessments[index]['proficiency_level'],
+                    'assessed_date': assessed_date
+                })
+        
+        chunk_size = current_app.config.get('ASSESSMENT_UPSERT_CHUNK_SIZE', 1000)
+        for chunk in chunked(rows, chunk_size):
+            existing = upsert_chunk(
+                employee_skills, chunk,
+                key_columns=['employee_id', 'skill_id'],
+                update_columns=['proficiency_level', 'assessed_date']
+            )
+            for row in chunk:
+                key = (row['employee_id'], row['skill_id'])
+                index = candidates[key]
+                outcomes[index] = _assessment_outcome(
+                    assessments, index, 'updated' if key in existing else 'inserted'
+                )
+        
+        mark_pairs_stale([(row['employee_id'], row['skill_id']) for row in rows])
+        if rows:
+            # Only per-employee profiles carry skill levels; the employee list is unchanged
+            bump_versions(SKILL_MATRIX, *{employee_entity(row['employee_id']) for row in rows})
+        
+        db.session.commit()
+        skill_matrix.patch_proficiencies(
+            [(row['employee_id'], row['skill_id'], row['proficiency_level']) for row in rows]
+        )
+        
+        summary = {status: 0 for status in ('inserted', 'updated', 'invalid', 'superseded')}
+        for outcome in outcomes:
+            summary[outcome['status']] += 1
+        
+        return jsonify({**summary, 'results': outcomes})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _assessment_outcome(assessments, index, status, error=None):
+    """Build the per-row result reported for one submitted assessment"""
+    item = assessments[index] if isinstance(assessments[index], dict) else {}
+    outcome = {
+        'index': index,
+        'employee_id': item.get('employee_id'),
+        'skill_id': item.get('skill_id'),
+        'status': status
+    }
+    if error:
+        outcome['error'] = error
+    return outcome
+
+def _validate_assessment(item):
+    """Return an error message for a malformed assessment, or None"""
+    if not isinstance(item, dict):
+        return 'Assessment must be an object'
+    
+    for field in ('employee_id', 'skill_id', 'proficiency_level'):
+        if not isinstance(item.get(field), int) or isinstance(item.get(field), bool):
+            return f'Missing or non-integer field: {field}'
+    
+    if not 1 <= item['proficiency_level'] <= 5:
+        return 'proficiency_level must be between 1 and 5'
+    
+    return None
+
+def _skill_profiles(employee_ids):
+    """Load skills with proficiency for many employees from one employee_skills/skill join"""
+    profiles = {employee_id: [] for employee_id in employee_ids}
+    if not profiles:
+        return profiles
+    
+    rows = db.session.execute(
+        select(
+            employee_skills.c.employee_id,
+            employee_skills.c.proficiency_level,
+            employee_skills.c.assessed_date,
+            Skill
+        ).join(
+            Skill, Skill.id == employee_skills.c.skill_id
+        ).where(
+            employee_skills.c.employee_id.in_(list(profiles))
+        ).order_by(employee_skills.c.employee_id, Skill.id)
+    ).all()
+    
+    for employee_id, proficiency_level, assessed_date, skill in rows:
+        skill_data = skill.to_dict()
+        skill_data['proficiency_level'] = proficiency_level
+        skill_data['assessed_date'] = assessed_date.isoformat() if assessed_date else None
+        profiles[employee_id].append(skill_data)
+    
+    return profiles
+
 @employees_bp.route('/<int:employee_id>/skills', methods=['POST'])
 def add_employee_skill(employee_id):
     """Add a skill to an employee with proficiency level"""
@@ -199,8 +413,11 @@ def add_employee_skill(employee_id):
                 assessed_date=datetime.utcnow()
             )
         )
+        mark_employee_skill_stale(employee_id, skill_id)
+        bump_versions(SKILL_MATRIX, employee_entity(employee_id))
         
         db.session.commit()
+        skill_matrix.patch_proficiency(employee_id, skill_id, proficiency_level)
         return jsonify({'message': 'Skill added successfully'}), 201
     except Exception as e:
         db.session.rollback()
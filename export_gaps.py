@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Export skill gap analysis results for BI tools.
+
+Writes SkillGapAnalysis rows joined with employee, role and skill attributes
+as Parquet, Arrow IPC stream or CSV, reading the database in bounded chunks.
+Prints a rows/sec report at the end.
+
+Usage:
+    python export_gaps.py --format parquet --output skill_gaps.parquet
+    python export_gaps.py --format csv --output high_gaps.csv --department Engineering --priority high,medium
+    python export_gaps.py --output q1.arrow --format arrow --date-from 2024-01-01 --date-to 2024-03-31
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.app import create_app
+from src.gap_export import EXPORT_FORMATS, build_export_query, parse_export_filters, write_export
+
+
+def main():
+    """Parse arguments and write the export file"""
+    parser = argparse.ArgumentParser(description='Export skill gap analysis results')
+    parser.add_argument('--output', required=True, help='Output file path')
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), help='Output format (default: from the file extension, else parquet)')
+    parser.add_argument('--department', help='Only employees of this department')
+    parser.add_argument('--priority', help='Comma-separated priorities (high, medium, low)')
+    parser.add_argument('--date-from', help='analysis_date on or after this ISO date/datetime')
+    parser.add_argument('--date-to', help='analysis_date up to this ISO date (inclusive) or before this datetime')
+    parser.add_argument('--chunk-size', type=int, help='Rows per batch (default: EXPORT_CHUNK_SIZE)')
+    parser.add_argument('--config', default=None, help='Configuration name (development, production, testing)')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+        fmt = next((name for name, (_, ext) in EXPORT_FORMATS.items() if extension in (name, ext)), 'parquet')
+
+    try:
+        filters = parse_export_filters(vars(args))
+    except ValueError as e:
+        parser.error(str(e))
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        started = time.perf_counter()
+        rows = write_export(build_export_query(**filters), fmt, args.output, args.chunk_size)
+        elapsed = time.perf_counter() - started
+
+    print("=" * 50)
+    print("GAP EXPORT SUMMARY")
+    print("=" * 50)
+    print(f"{'Format':<24}{fmt:>12}")
+    print(f"{'Rows':<24}{rows:>12,}")
+    print(f"{'Elapsed seconds':<24}{elapsed:>12.2f}")
+    print(f"{'Rows/sec':<24}{(rows / elapsed if elapsed else 0):>12,.0f}")
+    print(f"{'Output':<24}{args.output}")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
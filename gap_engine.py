@@ -0,0 +1,179 @@
+"""
+Set-based skill gap engine.
+
+Loads role requirements and current proficiencies for a whole employee
+population with one joined query and scores every (employee, skill) pair
+in a single NumPy pass, with training time from one batched model predict.
+"""
+from flask import current_app
+from sqlalchemy import and_, func, select
+from src.app import db
+from src.models import Employee, Skill, SkillGapAnalysis, employee_skills, role_skills
+from src.upsert import upsert_rows
+from src.versioning import SKILL_GAPS, bump_versions
+from src.lazy_imports import lazy_import
+from src.training_model import TRAINING_HOURS_PER_LEVEL, predict_training_hours
+from datetime import datetime
+
+np = lazy_import('numpy')
+
+PRIORITY_LABELS = ('Low', 'Medium', 'High')
+DEFAULT_REQUIRED_LEVEL = 3  # Mirrors the role_skills.required_level column default
+
+GAP_KEY_COLUMNS = ['employee_id', 'skill_id']
+GAP_UPDATE_COLUMNS = [
+    'current_level', 'required_level', 'gap_score', 'priority',
+    'predicted_training_time', 'analysis_date', 'job_id'
+]
+
+
+def fetch_gap_inputs(employee_ids=None):
+    """Fetch required and current skill levels for the target employees"""
+    stmt = select(
+        Employee.id,
+        Employee.first_name,
+        Employee.last_name,
+        role_skills.c.skill_id,
+        Skill.name,
+        Skill.category,
+        func.coalesce(role_skills.c.required_level, DEFAULT_REQUIRED_LEVEL),
+        func.coalesce(employee_skills.c.proficiency_level, 0)
+    ).join(
+        role_skills, role_skills.c.role_id == Employee.role_id
+    ).join(
+        Skill, Skill.id == role_skills.c.skill_id
+    ).outerjoin(
+        employee_skills,
+        and_(
+            employee_skills.c.employee_id == Employee.id,
+            employee_skills.c.skill_id == role_skills.c.skill_id
+        )
+    ).order_by(Employee.id, role_skills.c.skill_id)
+
+    if employee_ids is not None:
+        stmt = stmt.where(Employee.id.in_(list(employee_ids)))
+
+    rows = db.session.execute(stmt).all()
+    columns = list(zip(*rows)) if rows else [()] * 8
+
+    return {
+        'employee_id': np.array(columns[0], dtype=np.int64),
+        'employee_name': [f"{first} {last}" for first, last in zip(columns[1], columns[2])],
+        'skill_id': np.array(columns[3], dtype=np.int64),
+        'skill_name': list(columns[4]),
+        'skill_category': list(columns[5]),
+        'required_level': np.array(columns[6], dtype=np.int64),
+        'current_level': np.array(columns[7], dtype=np.int64)
+    }
+
+
+def score_gaps(current_levels, required_levels, skill_ids=None, skill_categories=None):
+    """Compute gap score, priority and predicted training time as arrays
+
+    With skill ids and categories, training time comes from the deployed
+    training-time model; otherwise TRAINING_HOURS_PER_LEVEL per missing level.
+    """
+    current = np.asarray(current_levels, dtype=np.int64)
+    required = np.asarray(required_levels, dtype=np.int64)
+
+    gap_score = current - required
+    priority = np.array(PRIORITY_LABELS)[np.select([gap_score <= -2, gap_score == -1], [2, 1], default=0)]
+    if skill_ids is None:
+        predicted_training_time = np.where(gap_score < 0, -gap_score * TRAINING_HOURS_PER_LEVEL, 0)
+    else:
+        predicted_training_time = predict_training_hours(skill_ids, skill_categories, gap_score)
+
+    return gap_score, priority, predicted_training_time
+
+
+def build_gap_results(inputs, scores):
+    """Turn engine arrays into the row dictionaries returned by the API"""
+    gap_score, priority, predicted_training_time = scores
+
+    return [
+        {
+            'employee_id': employee_id,
+            'employee_name': employee_name,
+            'skill_id': skill_id,
+            'skill_name': skill_name,
+            'current_level': current_level,
+            'required_level': required_level,
+            'gap_score': score,
+            'priority': label,
+            'predicted_training_time': hours
+        }
+        for employee_id, employee_name, skill_id, skill_name, current_level, required_level, score, label, hours
+        in zip(
+            inputs['employee_id'].tolist(),
+            inputs['employee_name'],
+            inputs['skill_id'].tolist(),
+            inputs['skill_name'],
+            inputs['current_level'].tolist(),
+            inputs['required_level'].tolist(),
+            gap_score.tolist(),
+            priority.tolist(),
+            predicted_training_time.tolist()
+        )
+    ]
+
+
+def save_gap_results(results, chunk_size=None, job_id=None):
+    """Bulk upsert results into SkillGapAnalysis; return (inserted, updated) counts
+
+    Rows are tagged with job_id, so a later write outside the job clears the tag.
+    """
+    chunk_size = chunk_size or current_app.config.get('GAP_UPSERT_CHUNK_SIZE', 1000)
+    analysis_date = datetime.utcnow()
+
+    rows = [
+        {
+            'employee_id': result['employee_id'],
+            'skill_id': result['skill_id'],
+            'current_level': result['current_level'],
+            'required_level': result['required_level'],
+            'gap_score': result['gap_score'],
+            'priority': result['priority'],
+            'predicted_training_time': result['predicted_training_time'],
+            'analysis_date': analysis_date,
+            'job_id': job_id
+        }
+        for result in results
+    ]
+    if rows:
+        bump_versions(SKILL_GAPS)
+
+    return upsert_rows(
+        SkillGapAnalysis.__table__,
+        rows,
+        key_columns=GAP_KEY_COLUMNS,
+        update_columns=GAP_UPDATE_COLUMNS,
+        chunk_size=chunk_size
+    )
+
+
+def filter_gap_inputs(inputs, mask):
+    """Keep only the input rows selected by a boolean mask"""
+    indexes = np.flatnonzero(mask).tolist()
+
+    return {
+        key: value[mask] if isinstance(value, np.ndarray) else [value[i] for i in indexes]
+        for key, value in inputs.items()
+    }
+
+
+def run_gap_analysis(employee_ids=None, inputs=None, job_id=None):
+    """Compute and persist gap analysis for the given employees (all if None)
+
+    Pre-fetched ``inputs`` may be passed to score a subset of pairs, and
+    ``job_id`` tags the rows as written by a background job.
+    Returns (results, inserted, updated).
+    """
+    if inputs is None:
+        inputs = fetch_gap_inputs(employee_ids)
+
+    scores = score_gaps(inputs['current_level'], inputs['required_level'], inputs['skill_id'], inputs['skill_category'])
+    results = build_gap_results(inputs, scores)
+
+    inserted, updated = save_gap_results(results, job_id=job_id)
+
+    return results, inserted, updated
@@ -0,0 +1,212 @@
+"""
+Columnar export of skill gap analysis results.
+
+Rows of ``SkillGapAnalysis`` joined with employee, role and skill attributes
+are read through a server-side cursor in EXPORT_CHUNK_SIZE batches, turned
+into Arrow record batches and written incrementally as Parquet (one row
+group per batch), Arrow IPC stream or CSV. Memory stays bounded by one
+batch regardless of the export size, and the same writer backs the
+``/api/analysis/export`` endpoint and the ``export_gaps.py`` CLI.
+"""
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import select
+from src.app import db
+from src.lazy_imports import lazy_import
+from src.models import Employee, Role, Skill, SkillGapAnalysis
+
+pa = lazy_import('pyarrow')
+pa_csv = lazy_import('pyarrow.csv')
+pa_ipc = lazy_import('pyarrow.ipc')
+pq = lazy_import('pyarrow.parquet')
+
+EXPORT_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'csv': ('text/csv', 'csv')
+}
+PRIORITIES = ('High', 'Medium', 'Low')
+
+# (output column, SQL expression, Arrow type name) in export order
+EXPORT_COLUMNS = (
+    ('gap_id', SkillGapAnalysis.id, 'int64'),
+    ('employee_id', SkillGapAnalysis.employee_id, 'int64'),
+    ('employee_code', Employee.employee_id, 'string'),
+    ('first_name', Employee.first_name, 'string'),
+    ('last_name', Employee.last_name, 'string'),
+    ('department', Employee.department, 'string'),
+    ('role_id', Employee.role_id, 'int64'),
+    ('role_title', Role.title, 'string'),
+    ('role_level', Role.level, 'string'),
+    ('skill_id', SkillGapAnalysis.skill_id, 'int64'),
+    ('skill_name', Skill.name, 'string'),
+    ('skill_category', Skill.category, 'string'),
+    ('current_level', SkillGapAnalysis.current_level, 'int64'),
+    ('required_level', SkillGapAnalysis.required_level, 'int64'),
+    ('gap_score', SkillGapAnalysis.gap_score, 'float64'),
+    ('priority', SkillGapAnalysis.priority, 'string'),
+    ('predicted_training_time', SkillGapAnalysis.predicted_training_time, 'int64'),
+    ('analysis_date', SkillGapAnalysis.analysis_date, 'timestamp')
+)
+
+
+def export_schema():
+    """Arrow schema of the export, fixed so every batch and format agree"""
+    types = {
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us')
+    }
+    return pa.schema([(name, types[type_name]) for name, _, type_name in EXPORT_COLUMNS])
+
+
+def parse_date_bound(value, field, end_of_day=False):
+    """Parse an ISO date or datetime; a bare end date covers that whole day"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        parsed = datetime.combine(value, time.min)
+        return parsed + timedelta(days=1) if end_of_day else parsed
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{field} must be an ISO date or datetime')
+
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def parse_export_filters(args):
+    """Validate export filters from query parameters or CLI options
+
+    Supports ``department``, ``priority`` (comma-separated) and an
+    ``analysis_date`` range via ``date_from``/``date_to``. Raises ValueError
+    on invalid input.
+    """
+    priorities = None
+    if args.get('priority'):
+        priorities = [priority.strip().capitalize() for priority in args['priority'].split(',') if priority.strip()]
+        invalid = [priority for priority in priorities if priority not in PRIORITIES]
+        if invalid:
+            raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}")
+
+    date_from = parse_date_bound(args.get('date_from'), 'date_from')
+    date_to = parse_date_bound(args.get('date_to'), 'date_to', end_of_day=True)
+    if date_from and date_to and date_from >= date_to:
+        raise ValueError('date_from must be before date_to')
+
+    return {
+        'department': args.get('department') or None,
+        'priorities': priorities,
+        'date_from': date_from,
+        'date_to': date_to
+    }
+
+
+def build_export_query(department=None, priorities=None, date_from=None, date_to=None):
+    """Select the export columns with filters applied, in gap id order"""
+    stmt = select(*[column.label(name) for name, column, _ in EXPORT_COLUMNS]).join(
+        Employee, Employee.id == SkillGapAnalysis.employee_id
+    ).join(
+        Skill, Skill.id == SkillGapAnalysis.skill_id
+    ).outerjoin(
+        Role, Role.id == Employee.role_id
+    )
+
+    if department:
+        stmt = stmt.where(Employee.department == department)
+    if priorities:
+        stmt = stmt.where(SkillGapAnalysis.priority.in_(priorities))
+    if date_from:
+        stmt = stmt.where(SkillGapAnalysis.analysis_date >= date_from)
+    if date_to:
+        stmt = stmt.where(SkillGapAnalysis.analysis_date < date_to)  # Exclusive upper bound
+
+    return stmt.order_by(SkillGapAnalysis.id)
+
+
+def iter_record_batches(stmt, chunk_size=None):
+    """Yield Arrow record batches of at most chunk_size rows from a server-side cursor"""
+    chunk_size = chunk_size or current_app.config.get('EXPORT_CHUNK_SIZE', 50000)
+    schema = export_schema()
+
+    # Plain column rows need no ORM loading; the session's connection keeps bind routing
+    result = db.session.connection().execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+
+
+class _StreamBuffer:
+    """Write-only file object that hands written bytes back between batches"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _open_writer(fmt, sink, schema):
+    if fmt == 'parquet':
+        return pq.ParquetWriter(sink, schema, compression='snappy')
+    if fmt == 'arrow':
+        return pa_ipc.new_stream(sink, schema)
+    if fmt == 'csv':
+        return pa_csv.CSVWriter(sink, schema)
+    raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def write_export(stmt, fmt, sink, chunk_size=None):
+    """Write the export to a file path or binary file object; return the row count"""
+    rows = 0
+    with _open_writer(fmt, sink, export_schema()) as writer:
+        for batch in iter_record_batches(stmt, chunk_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def stream_export(stmt, fmt, chunk_size=None):
+    """Yield the encoded export in pieces, one per record batch, for a streamed response"""
+    buffer = _StreamBuffer()
+    writer = _open_writer(fmt, buffer, export_schema())
+    try:
+        for batch in iter_record_batches(stmt, chunk_size):
+            writer.write_batch(batch)
+            data = buffer.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()  # Footer (Parquet) / end-of-stream marker (Arrow)
+
+    data = buffer.drain()
+    if data:
+        yield data
@@ -0,0 +1,199 @@
+"""
+Append-only gap history and trend aggregates.
+
+``SkillGapAnalysis`` only holds the latest result per (employee, skill).
+After every full org-wide analysis run (synchronous, streamed or as a
+job), ``record_gap_snapshot`` rolls that state up into ``GapTrendPoint``
+rows for the org, each department and each employee under a new run id,
+one INSERT ... SELECT per scope. Copying every (employee, skill) row into
+``GapSnapshot`` as well is opt-in (GAP_SNAPSHOT_RAW_ROWS), since it grows
+history by the size of the gap table on every run. Incremental runs take no
+snapshot, so they stay proportional to the changed pairs; their updates
+land in the next full run's snapshot. Trend queries read only the
+aggregates through the (scope, scope_key, snapshot_date) index.
+
+``compact_gap_history`` bounds storage: raw rows are dropped after
+GAP_HISTORY_RAW_RETENTION_DAYS, and runs older than
+GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS are thinned to the last run per
+GAP_HISTORY_DOWNSAMPLE_PERIOD.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import DateTime, String, case, cast, delete, func, insert, literal, select, update
+from src.app import db
+from src.models import Employee, GapSnapshot, GapSnapshotRun, GapTrendPoint, SkillGapAnalysis
+from src.upsert import chunked
+from src.versioning import GAP_HISTORY, bump_versions
+
+TREND_SCOPES = ('org', 'department', 'employee')
+TREND_PERIODS = ('run', 'day', 'week', 'month', 'quarter')
+DELETE_CHUNK_SIZE = 500
+
+
+def period_label(moment, period):
+    """Bucket label for a timestamp, e.g. '2024-05' (month) or '2024-Q2' (quarter)"""
+    if period == 'day':
+        return moment.strftime('%Y-%m-%d')
+    if period == 'week':
+        year, week, _ = moment.isocalendar()
+        return f'{year}-W{week:02d}'
+    if period == 'month':
+        return moment.strftime('%Y-%m')
+    if period == 'quarter':
+        return f'{moment.year}-Q{(moment.month - 1) // 3 + 1}'
+    raise ValueError(f"period must be one of: {', '.join(TREND_PERIODS)}")
+
+
+def record_gap_snapshot(source, engine=None):
+    """Append the current gap state as a new run of trend aggregates (plus raw rows if enabled); return the run"""
+    config = current_app.config
+    if not config.get('GAP_SNAPSHOTS_ENABLED', True):
+        return None
+    raw_rows = config.get('GAP_SNAPSHOT_RAW_ROWS', False)
+
+    run = GapSnapshotRun(run_date=datetime.utcnow(), source=source, engine=engine, raw_retained=raw_rows)
+    db.session.add(run)
+    db.session.flush()
+
+    run_id = literal(run.id)
+    run_date = literal(run.run_date, DateTime)
+    gaps = select(
+        SkillGapAnalysis.employee_id, SkillGapAnalysis.skill_id, Employee.department,
+        SkillGapAnalysis.current_level, SkillGapAnalysis.required_level, SkillGapAnalysis.gap_score,
+        SkillGapAnalysis.priority, SkillGapAnalysis.predicted_training_time
+    ).join(Employee, Employee.id == SkillGapAnalysis.employee_id).subquery()
+
+    run.rows = 0
+    if raw_rows:
+        run.rows = db.session.execute(insert(GapSnapshot).from_select(
+            ['run_id', 'snapshot_date', 'employee_id', 'skill_id', 'department', 'current_level',
+             'required_level', 'gap_score', 'priority', 'predicted_training_time'],
+            select(run_id, run_date, *gaps.c)
+        )).rowcount
+
+    is_gap = gaps.c.gap_score < 0
+    department_key = func.coalesce(gaps.c.department, '')
+    employee_key = cast(gaps.c.employee_id, String)
+
+    for scope, key, group_by in (
+        ('org', literal(''), ()),
+        ('department', department_key, (department_key,)),
+        ('employee', employee_key, (gaps.c.employee_id,))
+    ):
+        db.session.execute(insert(GapTrendPoint).from_select(
+            ['run_id', 'snapshot_date', 'scope', 'scope_key', 'employees', 'assessed_skills', 'gaps',
+             'high_priority_gaps', 'total_gap', 'training_hours'],
+            select(
+                run_id, run_date, literal(scope), key,
+                func.count(func.distinct(gaps.c.employee_id)),
+                func.count(),
+                func.coalesce(func.sum(case((is_gap, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((is_gap & (gaps.c.priority == 'High'), 1), else_=0)), 0),
+                func.coalesce(func.sum(case((is_gap, -gaps.c.gap_score), else_=0)), 0),
+                func.coalesce(func.sum(case((is_gap, gaps.c.predicted_training_time), else_=0)), 0)
+            ).select_from(gaps).group_by(*group_by)
+        ))
+
+    run.employees = db.session.execute(
+        select(GapTrendPoint.employees).where(GapTrendPoint.run_id == run.id, GapTrendPoint.scope == 'org')
+    ).scalar()
+    bump_versions(GAP_HISTORY)
+    return run
+
+
+def gap_trend(scope, key='', date_from=None, date_to=None, period='run'):
+    """Trend points for one scope, oldest first, with the change against the previous point
+
+    With a period other than 'run', only the last run of each bucket is kept,
+    so ``period='quarter'`` gives quarter-over-quarter figures.
+    """
+    if scope not in TREND_SCOPES:
+        raise ValueError(f"scope must be one of: {', '.join(TREND_SCOPES)}")
+    if period not in TREND_PERIODS:
+        raise ValueError(f"period must be one of: {', '.join(TREND_PERIODS)}")
+
+    stmt = select(GapTrendPoint).where(GapTrendPoint.scope == scope, GapTrendPoint.scope_key == str(key))
+    if date_from:
+        stmt = stmt.where(GapTrendPoint.snapshot_date >= date_from)
+    if date_to:
+        stmt = stmt.where(GapTrendPoint.snapshot_date < date_to)
+
+    points = []
+    for point in db.session.execute(stmt.order_by(GapTrendPoint.snapshot_date, GapTrendPoint.run_id)).scalars():
+        record = point.to_dict()
+        if period != 'run':
+            record['period'] = period_label(point.snapshot_date, period)
+            if points and points[-1]['period'] == record['period']:
+                points[-1] = record  # Later run in the same bucket wins
+                continue
+        points.append(record)
+
+    previous = None
+    for record in points:
+        record['gap_change'] = record['gaps'] - previous['gaps'] if previous else None
+        record['total_gap_change'] = round(record['total_gap'] - previous['total_gap'], 2) if previous else None
+        previous = record
+
+    return points
+
+
+def _delete_runs(run_ids):
+    for chunk in chunked(run_ids, DELETE_CHUNK_SIZE):
+        db.session.execute(delete(GapSnapshot).where(GapSnapshot.run_id.in_(chunk)))
+        db.session.execute(delete(GapTrendPoint).where(GapTrendPoint.run_id.in_(chunk)))
+        db.session.execute(delete(GapSnapshotRun).where(GapSnapshotRun.id.in_(chunk)))
+
+
+def compact_gap_history(now=None, raw_retention_days=None, downsample_after_days=None,
+                        downsample_period=None, dry_run=False):
+    """Drop expired raw snapshot rows and downsample old runs; return what was (or would be) removed"""
+    config = current_app.config
+    now = now or datetime.utcnow()
+    raw_retention_days = config.get('GAP_HISTORY_RAW_RETENTION_DAYS', 90) if raw_retention_days is None else raw_retention_days
+    downsample_after_days = config.get('GAP_HISTORY_DOWNSAMPLE_AFTER_DAYS', 180) if downsample_after_days is None else downsample_after_days
+    downsample_period = downsample_period or config.get('GAP_HISTORY_DOWNSAMPLE_PERIOD', 'month')
+    if downsample_period not in TREND_PERIODS or downsample_period == 'run':
+        raise ValueError(f"downsample period must be one of: {', '.join(TREND_PERIODS[1:])}")
+
+    # Keep the last run of each period bucket among runs past the downsampling age
+    old_runs = db.session.execute(
+        select(GapSnapshotRun.id, GapSnapshotRun.run_date)
+        .where(GapSnapshotRun.run_date < now - timedelta(days=downsample_after_days))
+        .order_by(GapSnapshotRun.run_date, GapSnapshotRun.id)
+    ).all()
+    kept = {}
+    for run_id, run_date in old_runs:
+        kept[period_label(run_date, downsample_period)] = run_id
+    removed_runs = sorted({run_id for run_id, _ in old_runs} - set(kept.values()))
+
+    # Raw rows of the surviving runs past the raw retention age
+    expired_raw = db.session.execute(
+        select(GapSnapshotRun.id)
+        .where(GapSnapshotRun.run_date < now - timedelta(days=raw_retention_days))
+        .where(GapSnapshotRun.raw_retained.is_(True))
+        .order_by(GapSnapshotRun.id)
+    ).scalars().all()
+    expired_raw = sorted(set(expired_raw) - set(removed_runs))
+
+    stats = {
+        'runs_removed': len(removed_runs),
+        'runs_raw_dropped': len(expired_raw),
+        'raw_rows_deleted': sum(
+            db.session.execute(
+                select(func.count()).select_from(GapSnapshot).where(GapSnapshot.run_id.in_(chunk))
+            ).scalar()
+            for chunk in chunked(removed_runs + expired_raw, DELETE_CHUNK_SIZE)
+        ),
+        'dry_run': dry_run
+    }
+    if dry_run:
+        return stats
+
+    _delete_runs(removed_runs)
+    for chunk in chunked(expired_raw, DELETE_CHUNK_SIZE):
+        db.session.execute(delete(GapSnapshot).where(GapSnapshot.run_id.in_(chunk)))
+        db.session.execute(update(GapSnapshotRun).where(GapSnapshotRun.id.in_(chunk)).values(raw_retained=False))
+
+    if removed_runs or expired_raw:
+        bump_versions(GAP_HISTORY)
+    return stats
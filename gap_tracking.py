@@ -0,0 +1,175 @@
+"""
+Change tracking for incremental skill gap recomputation.
+
+Write paths that affect gaps (proficiency changes, role reassignment and
+role requirement edits) record a GapRecomputeMark. Incremental analysis
+expands pending marks into (employee, skill) pairs, recomputes only those
+pairs and clears the marks it consumed.
+"""
+from sqlalchemy import and_, delete, event, exists, func, insert, select
+from src.app import db
+from src.models import Employee, GapRecomputeMark, Role, SkillGapAnalysis, role_skills
+from src.gap_engine import fetch_gap_inputs, filter_gap_inputs, run_gap_analysis
+from src.versioning import SKILL_GAPS, bump_versions
+from src.lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+
+def mark_employee_skill_stale(employee_id, skill_id):
+    """Flag a single (employee, skill) gap for recomputation"""
+    db.session.add(GapRecomputeMark(employee_id=employee_id, skill_id=skill_id))
+
+
+def mark_pairs_stale(pairs):
+    """Flag many (employee, skill) gaps at once with a single executemany"""
+    if pairs:
+        db.session.execute(
+            insert(GapRecomputeMark),
+            [{'employee_id': employee_id, 'skill_id': skill_id} for employee_id, skill_id in pairs]
+        )
+
+
+def mark_employee_stale(employee_id):
+    """Flag every gap of an employee for recomputation (e.g. after a role change)"""
+    db.session.add(GapRecomputeMark(employee_id=employee_id))
+
+
+def mark_employees_stale(employee_ids):
+    """Flag every gap of many employees at once with a single executemany"""
+    if employee_ids:
+        db.session.execute(insert(GapRecomputeMark), [{'employee_id': employee_id} for employee_id in employee_ids])
+
+
+def mark_role_stale(role_id, skill_id=None):
+    """Flag gaps of every employee holding a role (optionally for one skill)"""
+    db.session.add(GapRecomputeMark(role_id=role_id, skill_id=skill_id))
+
+
+def mark_roles_stale(role_ids):
+    """Flag gaps of every holder of many roles at once with a single executemany"""
+    if role_ids:
+        db.session.execute(insert(GapRecomputeMark), [{'role_id': role_id} for role_id in role_ids])
+
+
+@event.listens_for(Role.required_skills, 'append')
+@event.listens_for(Role.required_skills, 'remove')
+def _role_requirements_changed(role, skill, initiator):
+    """Record role_skills edits made through the Role.required_skills relationship"""
+    if role.id is not None and skill.id is not None:
+        mark_role_stale(role.id, skill.id)
+
+
+def clear_marks(up_to_id):
+    """Delete consumed marks; marks created after up_to_id are kept"""
+    if up_to_id is None:
+        return
+
+    db.session.execute(delete(GapRecomputeMark).where(GapRecomputeMark.id <= up_to_id))
+
+
+def latest_mark_id():
+    """Return the id of the newest pending mark, or None when nothing is stale"""
+    return db.session.query(func.max(GapRecomputeMark.id)).scalar()
+
+
+def _resolve_marks(up_to_id):
+    """Expand marks into employee-wide and per-skill stale sets"""
+    marks = db.session.execute(
+        select(GapRecomputeMark.employee_id, GapRecomputeMark.role_id, GapRecomputeMark.skill_id)
+        .where(GapRecomputeMark.id <= up_to_id)
+    ).all()
+
+    role_marks = [(role_id, skill_id) for employee_id, role_id, skill_id in marks if role_id is not None]
+    role_members = {}
+    if role_marks:
+        members = db.session.execute(
+            select(Employee.id, Employee.role_id)
+            .where(Employee.role_id.in_({role_id for role_id, _ in role_marks}))
+        ).all()
+        for employee_id, role_id in members:
+            role_members.setdefault(role_id, []).append(employee_id)
+
+    whole_employees = set()
+    stale_pairs = set()
+
+    for employee_id, role_id, skill_id in marks:
+        employee_ids = role_members.get(role_id, []) if role_id is not None else [employee_id]
+        for affected_id in employee_ids:
+            if skill_id is None:
+                whole_employees.add(affected_id)
+            else:
+                stale_pairs.add((affected_id, skill_id))
+
+    return whole_employees, stale_pairs
+
+
+def _pair_keys(employee_ids, skill_ids):
+    """Pack (employee_id, skill_id) pairs into one int64 key per pair"""
+    return (np.asarray(employee_ids, dtype=np.int64) << 32) | np.asarray(skill_ids, dtype=np.int64)
+
+
+def delete_unrequired_gaps(employee_ids=None):
+    """Remove gap rows for skills the employees' current roles no longer require (everyone when None)"""
+    still_required = exists().where(and_(
+        Employee.id == SkillGapAnalysis.employee_id,
+        role_skills.c.role_id == Employee.role_id,
+        role_skills.c.skill_id == SkillGapAnalysis.skill_id
+    ))
+
+    stmt = delete(SkillGapAnalysis).where(~still_required)
+    if employee_ids is not None:
+        stmt = stmt.where(SkillGapAnalysis.employee_id.in_(list(employee_ids)))
+
+    result = db.session.execute(stmt.execution_options(synchronize_session=False))
+    if result.rowcount:
+        bump_versions(SKILL_GAPS)
+
+    return result.rowcount
+
+
+def run_incremental_analysis():
+    """Recompute and persist only the gaps flagged by pending marks
+
+    Returns a dict with results, affected employees, row counts and the
+    number of marks processed.
+    """
+    up_to_id = latest_mark_id()
+    if up_to_id is None:
+        return {
+            'results': [], 'analyzed_employees': 0, 'rows_inserted': 0,
+            'rows_updated': 0, 'rows_deleted': 0, 'marks_processed': 0
+        }
+
+    marks_processed = db.session.query(func.count(GapRecomputeMark.id)).filter(
+        GapRecomputeMark.id <= up_to_id
+    ).scalar()
+
+    whole_employees, stale_pairs = _resolve_marks(up_to_id)
+    affected_employees = whole_employees | {employee_id for employee_id, _ in stale_pairs}
+
+    results, inserted, updated = [], 0, 0
+    if affected_employees:
+        inputs = fetch_gap_inputs(affected_employees)
+
+        mask = np.isin(inputs['employee_id'], list(whole_employees))
+        if stale_pairs:
+            pair_employees, pair_skills = zip(*stale_pairs)
+            mask |= np.isin(
+                _pair_keys(inputs['employee_id'], inputs['skill_id']),
+                _pair_keys(pair_employees, pair_skills)
+            )
+
+        results, inserted, updated = run_gap_analysis(inputs=filter_gap_inputs(inputs, mask))
+
+    deleted = delete_unrequired_gaps(affected_employees) if affected_employees else 0
+    clear_marks(up_to_id)
+
+    return {
+        'results': results,
+        'analyzed_employees': len(affected_employees),
+        'rows_inserted': inserted,
+        'rows_updated': updated,
+        'rows_deleted': deleted,
+        'marks_processed': marks_processed
+    }
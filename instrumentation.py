@@ -0,0 +1,173 @@
+"""
+Request-scoped latency and SQL instrumentation.
+
+Every request records its wall time, SQL statement count and time spent in
+the database (via SQLAlchemy cursor events). Totals are aggregated per
+endpoint into fixed-bucket histograms exposed at ``/metrics`` in the
+Prometheus text format, and can optionally be echoed back in a response
+header for spotting N+1 regressions on live traffic.
+"""
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+METRICS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_HEADER = 'X-Request-Metrics'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Seconds
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)  # Statements per request
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1  # +Inf bucket doubles as the observation count
+        self.series[labels] = (counts, total + value)
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(label_names, labels))
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{label_text}}} {counts[-1]}')
+        return lines
+
+
+class RequestMetrics:
+    """Thread-safe per-endpoint request, latency and SQL aggregates"""
+
+    LABELS = ('endpoint', 'method')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Request wall time by endpoint.', LATENCY_BUCKETS
+        )
+        self.db_time = Histogram(
+            'http_request_db_duration_seconds', 'Time spent executing SQL per request.', LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            'http_request_sql_statements', 'SQL statements issued per request.', QUERY_BUCKETS
+        )
+
+    def observe(self, endpoint, method, status, wall_time, db_time, query_count):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            labels = (endpoint, method)
+            self.latency.observe(labels, wall_time)
+            self.db_time.observe(labels, db_time)
+            self.queries.observe(labels, query_count)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            for histogram in (self.latency, self.db_time, self.queries):
+                histogram.series.clear()
+
+    def render(self):
+        """Render every series in the Prometheus text exposition format"""
+        with self._lock:
+            lines = ['# HELP http_requests_total Requests by endpoint, method and status.',
+                     '# TYPE http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+                )
+            for histogram in (self.latency, self.db_time, self.queries):
+                lines.extend(histogram.render(self.LABELS))
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if has_request_context() and 'request_stats' in g:
+        stats = g.request_stats
+        stats['queries'] += 1
+        stats['db_time'] += time.perf_counter() - started
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start_time'):
+        connection.info['query_start_time'].pop()
+
+
+def current_request_stats(stats=None):
+    """Return (wall seconds, db seconds, statements) for a request so far"""
+    stats = stats if stats is not None else g.request_stats
+    return time.perf_counter() - stats['started'], stats['db_time'], stats['queries']
+
+
+def _record(endpoint, method, stats, status):
+    wall_time, db_time, query_count = current_request_stats(stats)
+    request_metrics.observe(endpoint or 'unmatched', method, status, wall_time, db_time, query_count)
+
+
+def init_metrics(app):
+    """Attach the request hooks and the /metrics endpoint to an app"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def _start_request_stats():
+        g.request_stats = {'started': time.perf_counter(), 'queries': 0, 'db_time': 0.0, 'status': None}
+
+    @app.after_request
+    def _add_request_stats_header(response):
+        if 'request_stats' not in g:
+            return response
+        stats = g.request_stats
+        stats['status'] = response.status_code
+
+        if app.config.get('METRICS_RESPONSE_HEADER', False):
+            wall_time, db_time, query_count = current_request_stats()
+            response.headers[METRICS_HEADER] = (
+                f'wall_ms={wall_time * 1000:.2f}, db_ms={db_time * 1000:.2f}, queries={query_count}'
+            )
+
+        if response.is_streamed and request.endpoint != 'metrics':
+            # Streamed bodies keep running after teardown; record once the server closes them
+            stats['deferred'] = True
+            endpoint, method, status = request.endpoint, request.method, response.status_code
+            response.call_on_close(lambda: _record(endpoint, method, stats, status))
+        return response
+
+    @app.teardown_request
+    def _record_request_stats(error=None):
+        if 'request_stats' not in g or request.endpoint == 'metrics':
+            return
+        stats = g.request_stats
+        if stats.get('deferred') or stats.get('recorded'):
+            return
+        stats['recorded'] = True
+        _record(request.endpoint, request.method, stats, stats['status'] or (500 if error else 200))
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(request_metrics.render(), mimetype=METRICS_MIMETYPE)
@@ -0,0 +1,39 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+``np = lazy_import('numpy')`` binds a placeholder at module import time and
+performs the real import on first attribute access, so booting the app does
+not pay for libraries that only some requests use.
+"""
+import importlib
+import threading
+
+HEAVY_MODULES = ('numpy', 'pandas', 'sklearn', 'matplotlib', 'scipy', 'joblib', 'pyarrow')
+
+
+class LazyModule:
+    """Module placeholder that imports the real module on first use"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_import(name):
+    """Return a placeholder for module ``name`` that imports it on first attribute access"""
+    return LazyModule(name)
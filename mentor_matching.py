@@ -0,0 +1,170 @@
+"""
+Mentor matching over employee skill vectors.
+
+Each employee is a vector of proficiencies across all skills, taken from the
+cached skill matrix. For every skill that gets a lookup, a scikit-learn
+``NearestNeighbors`` index (cosine distance) is fitted on the employees
+strong in that skill (proficiency >= MENTOR_MIN_LEVEL) and kept. A lookup
+queries the learner's vector against that index for the nearest
+MENTOR_CANDIDATE_POOL, drops colleagues not above the learner's level, and
+re-ranks the rest by similarity, with a MENTOR_DEPARTMENT_BONUS for the
+same department. Peers at the learner's level can crowd the pool, so the
+query is widened (doubling) until ``limit`` mentors survive or the whole
+index has been searched.
+
+Proficiency patches on the skill matrix are queued and applied on the next
+lookup. Only the changed vectors are refreshed, and only the per-skill
+indexes those employees belong to (before or after the change) are
+refitted. A rebuilt or invalidated matrix rebuilds everything.
+"""
+import threading
+from collections import deque
+from flask import current_app
+from src.lazy_imports import lazy_import
+from src.skill_matrix import skill_matrix
+
+np = lazy_import('numpy')
+
+
+class MentorIndex:
+    """Per-skill nearest-neighbour indexes over skill vectors, synced with the skill matrix"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None  # Skill matrix snapshot the vectors were built from
+        self._min_level = None
+        self._vectors = None  # employee x skill float32 proficiencies
+        self._strong = None  # employee x skill bool, proficiency >= min level
+        self._indexes = {}  # skill column -> (employee rows, fitted NearestNeighbors)
+        self._pending = deque()  # Employee rows patched since the last sync
+        self.builds = 0
+        self.index_fits = 0
+        self.patched_rows = 0
+        self.lookups = 0
+
+    def notify_patch(self, rows):
+        """Skill matrix patch listener; cheap, the work happens on the next lookup"""
+        self._pending.append(rows)
+
+    def _sync(self, state, min_level):
+        if state is not self._state or min_level != self._min_level:
+            self._pending.clear()
+            self._vectors = state['proficiency'].astype(np.float32)
+            self._strong = state['proficiency'] >= min_level
+            self._indexes = {}
+            self._state, self._min_level = state, min_level
+            self.builds += 1
+            return
+
+        patched = []
+        while self._pending:
+            patched.append(self._pending.popleft())
+        if not patched:
+            return
+
+        rows = np.unique(np.concatenate(patched))
+        proficiency = state['proficiency'][rows]
+        strong = proficiency >= min_level
+        stale = np.flatnonzero((self._strong[rows] | strong).any(axis=0))
+
+        self._vectors[rows] = proficiency
+        self._strong[rows] = strong
+        for col in stale.tolist():
+            self._indexes.pop(col, None)
+        self.patched_rows += len(rows)
+
+    def _index_for(self, col):
+        entry = self._indexes.get(col)
+        if entry is None:
+            from sklearn.neighbors import NearestNeighbors
+
+            rows = np.flatnonzero(self._strong[:, col])
+            model = NearestNeighbors(metric='cosine', algorithm='brute')
+            if len(rows):
+                model.fit(self._vectors[rows])
+            entry = self._indexes[col] = (rows, model)
+            self.index_fits += 1
+        return entry
+
+    def find_mentors(self, employee_id, skill_id, limit=5):
+        """Return (learner info, mentors) for an employee's gap in a skill; None if either is not in the matrix"""
+        config = current_app.config
+        min_level = config.get('MENTOR_MIN_LEVEL', 4)
+        pool_size = config.get('MENTOR_CANDIDATE_POOL', 50)
+        department_bonus = config.get('MENTOR_DEPARTMENT_BONUS', 0.1)
+
+        state = skill_matrix.snapshot()  # Outside our lock: patch listeners run under the matrix lock
+        row = state['employee_index'].get(employee_id)
+        col = state['skill_index'].get(skill_id)
+        if row is None or col is None:
+            return None
+
+        current_level = int(state['proficiency'][row, col])
+        with self._lock:
+            self._sync(state, min_level)
+            rows, model = self._index_for(col)
+            self.lookups += 1
+
+            # The learner is never above their own level, so this also excludes them
+            wanted = min(limit, int((state['proficiency'][rows, col] > current_level).sum()))
+            neighbours = distances = np.array([], dtype=np.int64)
+            n_neighbors = min(len(rows), max(pool_size, limit + 1)) if wanted else 0
+            while n_neighbors:
+                distances, positions = model.kneighbors(self._vectors[row:row + 1], n_neighbors=n_neighbors)
+                distances, neighbours = distances[0], rows[positions[0]]
+                eligible = state['proficiency'][neighbours, col] > current_level
+                distances, neighbours = distances[eligible], neighbours[eligible]
+                if len(neighbours) >= wanted or n_neighbors == len(rows):
+                    break
+                n_neighbors = min(len(rows), n_neighbors * 2)
+
+        role_row = int(state['employee_roles'][row])
+        required_level = (
+            int(state['requirements'][role_row, col])
+            if role_row >= 0 and state['required'][role_row, col] else None
+        )
+        department = state['employee_departments'][row]
+
+        mentors = []
+        for mentor_row, distance in zip(neighbours.tolist(), distances.tolist()):
+            level = int(state['proficiency'][mentor_row, col])
+            same_department = department is not None and state['employee_departments'][mentor_row] == department
+            similarity = 1.0 - distance
+            mentors.append({
+                'employee_id': int(state['employee_ids'][mentor_row]),
+                'employee_name': state['employee_names'][mentor_row],
+                'department': state['employee_departments'][mentor_row],
+                'proficiency_level': level,
+                'profile_similarity': round(similarity, 3),
+                'same_department': same_department,
+                'match_score': round(similarity + (department_bonus if same_department else 0), 3)
+            })
+
+        mentors.sort(key=lambda m: (-m['match_score'], -m['proficiency_level'], m['employee_id']))
+        learner = {
+            'employee_id': employee_id,
+            'employee_name': state['employee_names'][row],
+            'department': department,
+            'skill_id': skill_id,
+            'skill_name': state['skill_names'][col],
+            'current_level': current_level,
+            'required_level': required_level
+        }
+        return learner, mentors[:limit]
+
+    def stats(self):
+        """Report index builds, refits and lookups"""
+        with self._lock:
+            return {
+                'loaded': self._state is not None,
+                'builds': self.builds,
+                'skill_indexes': len(self._indexes),
+                'index_fits': self.index_fits,
+                'patched_rows': self.patched_rows,
+                'pending_patches': len(self._pending),
+                'lookups': self.lookups
+            }
+
+
+mentor_index = MentorIndex()
+skill_matrix.add_patch_listener(mentor_index.notify_patch)
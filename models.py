@@ -38,19 +38,21 @@ class Employee(db.Model):
     def __repr__(self):
         return f'<Employee {self.employee_id}: {self.first_name} {self.last_name}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'employee_id': self.employee_id,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'email': self.email,
-            'department': self.department,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'role': self.role.to_dict() if self.role else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+    def to_dict(self, fields=None):
+        """Serialize the employee; ``fields`` limits the output to a subset of keys"""
+        serializers = {
+            'id': lambda: self.id,
+            'employee_id': lambda: self.employee_id,
+            'first_name': lambda: self.first_name,
+            'last_name': lambda: self.last_name,
+            'email': lambda: self.email,
+            'department': lambda: self.department,
+            'hire_date': lambda: self.hire_date.isoformat() if self.hire_date else None,
+            'role': lambda: self.role.to_dict() if self.role else None,
+            'created_at': lambda: self.created_at.isoformat(),
+            'updated_at': lambda: self.updated_at.isoformat()
         }
+        return {key: serialize() for key, serialize in serializers.items() if fields is None or key in fields}
 
 class Skill(db.Model):
     """Skill model"""
@@ -63,14 +65,16 @@ class Skill(db.Model):
     def __repr__(self):
         return f'<Skill {self.name}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'category': self.category,
-            'created_at': self.created_at.isoformat()
+    def to_dict(self, fields=None):
+        """Serialize the skill; ``fields`` limits the output to a subset of keys"""
+        serializers = {
+            'id': lambda: self.id,
+            'name': lambda: self.name,
+            'description': lambda: self.description,
+            'category': lambda: self.category,
+            'created_at': lambda: self.created_at.isoformat()
         }
+        return {key: serialize() for key, serialize in serializers.items() if fields is None or key in fields}
 
 class Role(db.Model):
     """Job role model"""
@@ -132,6 +136,13 @@ class TrainingRecord(db.Model):
 
 class SkillGapAnalysis(db.Model):
     """Skill gap analysis results model"""
+    __table_args__ = (
+        db.UniqueConstraint('employee_id', 'skill_id', name='uq_skill_gap_analysis_employee_skill'),
+        # Support recommendation filtering/ordering by priority and gap size
+        db.Index('ix_skill_gap_analysis_priority_gap', 'priority', 'gap_score'),
+        db.Index('ix_skill_gap_analysis_gap_score', 'gap_score'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
     skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), nullable=False)
@@ -141,6 +152,7 @@ class SkillGapAnalysis(db.Model):
     priority = db.Column(db.String(20), default='Medium')  # High, Medium, Low
     predicted_training_time = db.Column(db.Integer)  # In hours
     analysis_date = db.Column(db.DateTime, default=datetime.utcnow)
+    job_id = db.Column(db.String(36), index=True)  # Background job that last wrote the row, if any
     
     # Relationships
     employee = db.relationship('Employee', backref='skill_gaps')
@@ -161,3 +173,141 @@ class SkillGapAnalysis(db.Model):
             'predicted_training_time': self.predicted_training_time,
             'analysis_date': self.analysis_date.isoformat()
         }
+
+class GapRecomputeMark(db.Model):
+    """Pending gap recomputation marker written by skill, employee and role changes"""
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(db.Integer, index=True)  # Null for role-wide marks
+    role_id = db.Column(db.Integer, index=True)  # Set for role requirement changes
+    skill_id = db.Column(db.Integer)  # Null = every required skill is stale
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<GapRecomputeMark Employee:{self.employee_id} Role:{self.role_id} Skill:{self.skill_id}>'
+
+class AnalysisJob(db.Model):
+    """Background skill gap analysis job"""
+    id = db.Column(db.String(36), primary_key=True)  # UUID
+    status = db.Column(db.String(20), default='Queued')  # Queued, Running, Completed, Failed
+    employee_id = db.Column(db.Integer)  # Null = org-wide analysis
+    total_employees = db.Column(db.Integer, default=0)
+    processed_employees = db.Column(db.Integer, default=0)
+    rows_inserted = db.Column(db.Integer, default=0)
+    rows_updated = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<AnalysisJob {self.id}: {self.status}>'
+    
+    def to_dict(self):
+        elapsed = None
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'employee_id': self.employee_id,
+            'total_employees': self.total_employees,
+            'processed_employees': self.processed_employees,
+            'percent_complete': round(
+                100.0 * self.processed_employees / self.total_employees, 1
+            ) if self.total_employees else (100.0 if self.status == 'Completed' else 0.0),
+            'employees_per_second': round(self.processed_employees / elapsed, 2) if elapsed else None,
+            'rows_inserted': self.rows_inserted,
+            'rows_updated': self.rows_updated,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class GapSnapshotRun(db.Model):
+    """One recorded org-wide analysis run; rows are only ever appended or compacted away"""
+    id = db.Column(db.Integer, primary_key=True)  # Run id
+    run_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    source = db.Column(db.String(20))  # full, incremental, stream, job
+    engine = db.Column(db.String(20))
+    employees = db.Column(db.Integer, default=0)
+    rows = db.Column(db.Integer, default=0)  # Raw GapSnapshot rows written
+    raw_retained = db.Column(db.Boolean, default=True)  # False once compaction dropped the raw rows
+    
+    def __repr__(self):
+        return f'<GapSnapshotRun {self.id} at {self.run_date}>'
+    
+    def to_dict(self):
+        return {
+            'run_id': self.id,
+            'run_date': self.run_date.isoformat(),
+            'source': self.source,
+            'engine': self.engine,
+            'employees': self.employees,
+            'rows': self.rows,
+            'raw_retained': self.raw_retained
+        }
+
+class GapSnapshot(db.Model):
+    """Append-only copy of every (employee, skill) gap as of one snapshot run"""
+    __table_args__ = (
+        db.Index('ix_gap_snapshot_date', 'snapshot_date'),
+        db.Index('ix_gap_snapshot_employee_date', 'employee_id', 'snapshot_date'),
+    )
+    
+    run_id = db.Column(db.Integer, db.ForeignKey('gap_snapshot_run.id'), primary_key=True)
+    employee_id = db.Column(db.Integer, primary_key=True)  # No FK: history outlives deleted employees
+    skill_id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.DateTime, nullable=False)  # Copy of the run date for time-range scans
+    department = db.Column(db.String(100))  # Department at snapshot time
+    current_level = db.Column(db.SmallInteger)
+    required_level = db.Column(db.SmallInteger)
+    gap_score = db.Column(db.Float)
+    priority = db.Column(db.String(20))
+    predicted_training_time = db.Column(db.Integer)
+    
+    def __repr__(self):
+        return f'<GapSnapshot Run:{self.run_id} Employee:{self.employee_id} Skill:{self.skill_id}>'
+
+class GapTrendPoint(db.Model):
+    """Per-run gap aggregate for the org, one department or one employee"""
+    __table_args__ = (
+        db.Index('ix_gap_trend_point_scope_date', 'scope', 'scope_key', 'snapshot_date'),
+    )
+    
+    run_id = db.Column(db.Integer, db.ForeignKey('gap_snapshot_run.id'), primary_key=True)
+    scope = db.Column(db.String(20), primary_key=True)  # org, department, employee
+    scope_key = db.Column(db.String(100), primary_key=True)  # '' for org, department name, employee id
+    snapshot_date = db.Column(db.DateTime, nullable=False)
+    employees = db.Column(db.Integer, default=0)
+    assessed_skills = db.Column(db.Integer, default=0)
+    gaps = db.Column(db.Integer, default=0)  # Rows below requirement
+    high_priority_gaps = db.Column(db.Integer, default=0)
+    total_gap = db.Column(db.Float, default=0)  # Sum of levels missing across gaps
+    training_hours = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<GapTrendPoint Run:{self.run_id} {self.scope}:{self.scope_key}>'
+    
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'snapshot_date': self.snapshot_date.isoformat(),
+            'employees': self.employees,
+            'assessed_skills': self.assessed_skills,
+            'gaps': self.gaps,
+            'high_priority_gaps': self.high_priority_gaps,
+            'total_gap': self.total_gap,
+            'average_gap': round(self.total_gap / self.gaps, 2) if self.gaps else 0,
+            'training_hours': self.training_hours
+        }
+
+class EntityVersion(db.Model):
+    """Monotonic change counter per entity, used to derive ETags for conditional GETs"""
+    entity = db.Column(db.String(100), primary_key=True)  # e.g. 'skills', 'employee:42'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<EntityVersion {self.entity}={self.version}>'
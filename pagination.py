@@ -0,0 +1,66 @@
+"""
+Keyset pagination and sparse field selection for list endpoints.
+"""
+from flask import current_app
+
+
+def parse_fields(raw_fields, allowed_fields):
+    """Parse a comma-separated ``fields=`` value; None means every field
+
+    Raises ValueError for unknown field names.
+    """
+    if not raw_fields:
+        return None
+
+    fields = {field.strip() for field in raw_fields.split(',') if field.strip()}
+    unknown = fields - set(allowed_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    fields.add('id')  # Needed as the pagination cursor
+    return fields
+
+
+def keyset_page(query, id_column, after_id=None, limit=None):
+    """Order by id and apply an ``id > after_id`` cursor plus a bounded limit
+
+    Returns (query, limit) where limit is None when the request is unpaginated.
+    """
+    query = query.order_by(id_column)
+
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+
+    if limit is not None:
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        limit = min(limit, current_app.config.get('API_MAX_PAGE_SIZE', 1000))
+        query = query.limit(limit)
+
+    return query, limit
+
+
+def keyset_slice(items, after_id=None, limit=None):
+    """In-memory counterpart of keyset_page for id-ordered lists of dicts
+
+    Returns (items, limit) where limit is None when the request is unpaginated.
+    """
+    if after_id is not None:
+        items = [item for item in items if item['id'] > after_id]
+
+    if limit is not None:
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        limit = min(limit, current_app.config.get('API_MAX_PAGE_SIZE', 1000))
+        items = items[:limit]
+
+    return items, limit
+
+
+def next_cursor(items, limit):
+    """Return the after_id for the next page, or None on the last page"""
+    if limit is None or len(items) < limit:
+        return None
+
+    last = items[-1]
+    return last['id'] if isinstance(last, dict) else last.id
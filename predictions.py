@@ -0,0 +1,149 @@
+"""
+Batch skill-development predictions.
+
+Loads every open gap of the selected employees, with the employee's
+department, tenure and role level and the skill name, in one outer-joined
+query. Adjusted training hours, completion weeks and success probabilities
+are then computed as arrays and folded into per-employee summaries with
+``np.bincount``. Employees without open gaps appear with zero totals.
+A department selection is counted first, so an oversized one is rejected
+before any gap rows are loaded.
+"""
+from flask import current_app
+from sqlalchemy import and_, func, select
+from src.app import db
+from src.lazy_imports import lazy_import
+from src.models import Employee, Role, Skill, SkillGapAnalysis
+from src.training_model import experience_bucket, factor_tables, success_probabilities
+
+np = lazy_import('numpy')
+
+
+def fetch_prediction_inputs(employee_ids=None, department=None):
+    """Rows of (employee, open gap) for the selection; gap columns are None for employees without gaps"""
+    stmt = select(
+        Employee.id,
+        Employee.first_name,
+        Employee.last_name,
+        Employee.department,
+        Employee.hire_date,
+        Role.level,
+        SkillGapAnalysis.skill_id,
+        Skill.name,
+        SkillGapAnalysis.current_level,
+        SkillGapAnalysis.required_level,
+        SkillGapAnalysis.gap_score,
+        SkillGapAnalysis.predicted_training_time,
+        SkillGapAnalysis.priority
+    ).outerjoin(
+        Role, Role.id == Employee.role_id
+    ).outerjoin(
+        SkillGapAnalysis,
+        and_(SkillGapAnalysis.employee_id == Employee.id, SkillGapAnalysis.gap_score < 0)
+    ).outerjoin(
+        Skill, Skill.id == SkillGapAnalysis.skill_id
+    ).order_by(Employee.id, SkillGapAnalysis.skill_id)
+
+    if employee_ids is not None:
+        stmt = stmt.where(Employee.id.in_(list(employee_ids)))
+    if department is not None:
+        stmt = stmt.where(Employee.department == department)
+
+    return db.session.execute(stmt).all()
+
+
+def count_department_employees(department):
+    """Number of employees a department selection would load"""
+    return db.session.execute(
+        select(func.count(Employee.id)).where(Employee.department == department)
+    ).scalar()
+
+
+def batch_predictions(employee_ids=None, department=None, include_predictions=False):
+    """Per-employee development predictions plus an org total for a set of employees"""
+    rows = fetch_prediction_inputs(employee_ids, department)
+    threshold = current_app.config.get('PREDICTION_THRESHOLD', 0.7)
+    hours_per_week = current_app.config.get('TRAINING_HOURS_PER_WEEK', 8)
+    experience_factors, role_level_factors = factor_tables()
+
+    # One entry per employee, in id order
+    employees = []
+    employee_rows = []
+    for row in rows:
+        if not employees or employees[-1]['employee_id'] != row[0]:
+            employees.append({
+                'employee_id': row[0],
+                'employee_name': f"{row[1]} {row[2]}",
+                'department': row[3],
+                'experience_factor': experience_factors.get(experience_bucket(row[4]), 1.0),
+                'role_level_factor': role_level_factors.get(row[5], 1.0)
+            })
+        employee_rows.append(len(employees) - 1)
+
+    # Keep only rows that carry a gap
+    has_gap = np.array([row[10] is not None for row in rows], dtype=bool)
+    gap_rows = [row for row, keep in zip(rows, has_gap.tolist()) if keep]
+    owner = np.array(employee_rows, dtype=np.int64)[has_gap]
+
+    gap_score = np.array([row[10] for row in gap_rows], dtype=np.float64)
+    base_hours = np.array([row[11] or 0 for row in gap_rows], dtype=np.float64)
+    high_priority = np.array([row[12] == 'High' for row in gap_rows], dtype=bool)
+
+    experience = np.array([e['experience_factor'] for e in employees], dtype=np.float64)
+    role_level = np.array([e['role_level_factor'] for e in employees], dtype=np.float64)
+    hours = np.floor(base_hours * experience[owner] * role_level[owner]).astype(np.int64)
+    weeks = hours // hours_per_week
+    success = np.round(success_probabilities(gap_score), 2)
+    meets_threshold = success >= threshold
+
+    count = len(employees)
+    gaps_per_employee = np.bincount(owner, minlength=count)
+    hours_per_employee = np.bincount(owner, weights=hours, minlength=count).astype(np.int64)
+    success_per_employee = np.bincount(owner, weights=success, minlength=count)
+    high_per_employee = np.bincount(owner, weights=high_priority, minlength=count).astype(np.int64)
+    meeting_per_employee = np.bincount(owner, weights=meets_threshold, minlength=count).astype(np.int64)
+
+    if include_predictions:
+        starts = np.concatenate(([0], np.cumsum(gaps_per_employee)))
+        hours_list, weeks_list = hours.tolist(), weeks.tolist()
+        success_list, meets_list = success.tolist(), meets_threshold.tolist()
+
+    for i, employee in enumerate(employees):
+        gaps = int(gaps_per_employee[i])
+        employee.update({
+            'gaps': gaps,
+            'high_priority_gaps': int(high_per_employee[i]),
+            'total_training_hours': int(hours_per_employee[i]),
+            'estimated_completion_weeks': int(hours_per_employee[i] // hours_per_week),
+            'average_success_probability': round(float(success_per_employee[i]) / gaps, 2) if gaps else 0,
+            'predictions_meeting_threshold': int(meeting_per_employee[i])
+        })
+        if include_predictions:
+            employee['predictions'] = [
+                {
+                    'skill_id': gap_rows[j][6],
+                    'skill_name': gap_rows[j][7],
+                    'current_level': gap_rows[j][8],
+                    'target_level': gap_rows[j][9],
+                    'predicted_training_hours': hours_list[j],
+                    'success_probability': success_list[j],
+                    'meets_threshold': meets_list[j],
+                    'estimated_completion_weeks': weeks_list[j],
+                    'priority': gap_rows[j][12]
+                }
+                for j in range(int(starts[i]), int(starts[i + 1]))
+            ]
+
+    total_hours = int(hours.sum())
+    total = {
+        'employees': count,
+        'employees_with_gaps': int(np.count_nonzero(gaps_per_employee)),
+        'gaps': len(gap_rows),
+        'high_priority_gaps': int(high_priority.sum()),
+        'total_training_hours': total_hours,
+        'estimated_completion_weeks': total_hours // hours_per_week,
+        'average_success_probability': round(float(success.mean()), 2) if len(success) else 0,
+        'predictions_meeting_threshold': int(meets_threshold.sum())
+    }
+
+    return employees, total
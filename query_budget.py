@@ -0,0 +1,169 @@
+"""
+Per-request SQL query budgets and N+1 detection.
+
+Every statement issued while handling a request is reduced to a fingerprint
+(literals, bound parameters and IN-lists collapsed) and counted. A request
+is flagged when it exceeds the endpoint's declared budget or repeats one
+fingerprint more often than the N+1 threshold. QUERY_BUDGET_MODE decides
+what happens then: ``off`` skips tracking, ``log`` warns with the code
+location that issued the repeated statement (staging), and ``raise`` fails
+the request with QueryBudgetExceeded (tests).
+"""
+import logging
+import os
+import re
+import traceback
+from collections import Counter
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODES = ('off', 'log', 'raise')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),                              # String literals
+    (re.compile(r'%\(\w+\)s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\]'), '?'),  # Named / numbered / expanding params
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),                           # Numeric literals
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?+)'),               # IN (...) lists of any length
+    (re.compile(r'\s+'), ' ')
+]
+
+_active_trackers = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in ``raise`` mode when a request breaks its query budget"""
+
+
+def fingerprint(statement):
+    """Reduce a SQL statement to its shape so repeated lookups compare equal"""
+    for pattern, replacement in _FINGERPRINT_RULES:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def _statement_origin():
+    """Return the innermost project frame outside this module that issued a statement"""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith('<'):
+            continue  # Generated code such as SQLAlchemy's decorator wrappers
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(PROJECT_ROOT) and 'site-packages' not in filename
+                and filename != os.path.abspath(__file__)):
+            return f'{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryTracker:
+    """Fingerprint counts for one request or one test block"""
+
+    def __init__(self):
+        self.total = 0
+        self.counts = Counter()
+        self.origins = {}
+
+    def record(self, statement):
+        shape = fingerprint(statement)
+        self.total += 1
+        self.counts[shape] += 1
+        if self.counts[shape] == 2:
+            # Only repeated shapes need a location, so the stack walk is paid once per shape
+            self.origins[shape] = _statement_origin()
+
+    def repeated(self, threshold):
+        """Return [(fingerprint, count, origin)] for shapes issued more than threshold times"""
+        return [
+            (shape, count, self.origins.get(shape))
+            for shape, count in self.counts.most_common()
+            if count > threshold
+        ]
+
+    def violations(self, max_queries=None, repeat_threshold=None):
+        """Describe every budget / N+1 violation as a list of messages"""
+        messages = []
+        if max_queries is not None and self.total > max_queries:
+            messages.append(f'{self.total} SQL statements exceed the budget of {max_queries}')
+        if repeat_threshold is not None:
+            for shape, count, origin in self.repeated(repeat_threshold):
+                messages.append(f'Repeated {count}x (N+1?) from {origin or "unknown"}: {shape[:200]}')
+        return messages
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _track_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'query_tracker' in g:
+        g.query_tracker.record(statement)
+    for tracker in _active_trackers:
+        tracker.record(statement)
+
+
+def query_budget(max_queries=None, repeat_threshold=None):
+    """Declare a view's maximum SQL statement count and optional N+1 threshold override"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.query_budget = {'max_queries': max_queries, 'repeat_threshold': repeat_threshold}
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def exempt_from_query_budget():
+    """Skip budget checks for the current request (e.g. the row-at-a-time legacy engine)"""
+    if has_request_context():
+        g.query_budget_exempt = True
+
+
+def track_queries():
+    """Start an ad hoc tracker outside a request; pair with stop_tracking()"""
+    tracker = QueryTracker()
+    _active_trackers.append(tracker)
+    return tracker
+
+
+def stop_tracking(tracker):
+    if tracker in _active_trackers:
+        _active_trackers.remove(tracker)
+
+
+def _check_request(mode):
+    tracker = g.query_tracker
+    budget = g.get('query_budget') or {}
+    repeat_threshold = budget.get('repeat_threshold')
+    if repeat_threshold is None:
+        repeat_threshold = current_app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+    messages = tracker.violations(budget.get('max_queries'), repeat_threshold)
+    if not messages:
+        return
+
+    summary = f'{request.method} {request.path} ({request.endpoint}): ' + '; '.join(messages)
+    if mode == 'raise':
+        raise QueryBudgetExceeded(summary)
+    logger.warning('Query budget violation: %s', summary)
+
+
+def init_query_budget(app):
+    """Attach per-request query tracking according to QUERY_BUDGET_MODE"""
+    mode = app.config.get('QUERY_BUDGET_MODE', 'off')
+    if mode not in QUERY_BUDGET_MODES:
+        raise ValueError(f"QUERY_BUDGET_MODE must be one of: {', '.join(QUERY_BUDGET_MODES)}")
+    if mode == 'off':
+        return
+
+    @app.before_request
+    def _start_query_tracking():
+        # Requests can share an app context (e.g. under pytest-flask), so drop a previous declaration
+        g.pop('query_budget', None)
+        g.pop('query_budget_exempt', None)
+        g.query_tracker = QueryTracker()
+
+    @app.after_request
+    def _check_query_budget(response):
+        # Streamed bodies run after this hook, so only statements issued before the first row count
+        if 'query_tracker' in g and not g.get('query_budget_exempt'):
+            _check_request(mode)
+        return response
@@ -0,0 +1,79 @@
+"""
+pytest plugin for SQL query budgets.
+
+Enable it from a conftest.py with ``pytest_plugins = ['src.query_budget_plugin']``.
+Requests made through the Flask test client are checked against their
+endpoint budgets automatically (TestingConfig runs with
+QUERY_BUDGET_MODE='raise'); this plugin adds budgets for whole tests and
+blocks of test code:
+
+    @pytest.mark.query_budget(5)
+    def test_employee_detail(client): ...
+
+    def test_batch(client, assert_max_queries):
+        with assert_max_queries(3):
+            client.post('/api/employees/skills/batch', json={'employee_ids': [1, 2, 3]})
+"""
+from contextlib import contextmanager
+import pytest
+from src.query_budget import stop_tracking, track_queries
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(max_queries, repeat_threshold=None): fail when the test issues more SQL statements'
+    )
+
+
+def _fail_on_violations(tracker, max_queries=None, repeat_threshold=None):
+    messages = tracker.violations(max_queries, repeat_threshold)
+    if messages:
+        pytest.fail('Query budget exceeded:\n  ' + '\n  '.join(messages), pytrace=False)
+
+
+@pytest.fixture
+def query_tracker():
+    """Fingerprint counts for every statement issued during the test"""
+    tracker = track_queries()
+    yield tracker
+    stop_tracking(tracker)
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager failing the test when its block exceeds a query budget"""
+    @contextmanager
+    def check(max_queries, repeat_threshold=None):
+        tracker = track_queries()
+        try:
+            yield tracker
+        finally:
+            stop_tracking(tracker)
+        _fail_on_violations(tracker, max_queries, repeat_threshold)
+
+    return check
+
+
+@pytest.hookimpl(tryfirst=True, specname='pytest_runtest_call')
+def pytest_runtest_call_start_budget(item):
+    """Start counting for @pytest.mark.query_budget tests (fixture setup is not counted)"""
+    if item.get_closest_marker('query_budget') is not None:
+        item.query_budget_tracker = track_queries()
+
+
+@pytest.hookimpl(trylast=True, specname='pytest_runtest_call')
+def pytest_runtest_call_check_budget(item):
+    """Fail a @pytest.mark.query_budget test that went over its budget"""
+    tracker = getattr(item, 'query_budget_tracker', None)
+    if tracker is not None:
+        stop_tracking(tracker)
+        marker = item.get_closest_marker('query_budget')
+        _fail_on_violations(tracker, *marker.args, **marker.kwargs)
+
+
+def pytest_runtest_teardown(item):
+    """Release the tracker of a test whose body raised before the check"""
+    tracker = getattr(item, 'query_budget_tracker', None)
+    if tracker is not None:
+        stop_tracking(tracker)
@@ -0,0 +1,155 @@
+"""
+Read-through cache for rarely changing reference data.
+
+Skills, skill categories, roles and role requirements are loaded on first
+use and kept in a bounded, thread-safe LRU whose entries expire after
+REFERENCE_CACHE_TTL seconds. skills.py write handlers and role requirement
+edits invalidate the affected kinds explicitly. Each worker process holds
+its own cache, so skill entries also carry the ``skills`` version they were
+loaded at and are reloaded once it moves; a body served under a
+``conditional_get(SKILLS)`` ETag therefore always matches that ETag. Role
+entries are bounded by the TTL only.
+
+Cached values are shared between requests and must be treated as read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event, select
+from src.app import db
+from src.database import primary_reads
+from src.models import Role, Skill, role_skills
+from src.versioning import SKILLS, request_versions
+
+
+class ReferenceCache:
+    """Thread-safe LRU cache with a per-entry TTL, keyed by (kind, ...) tuples"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, version, value)
+        self._generation = 0  # Bumped by invalidate() so in-flight loads are not stored
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, loader, version=None):
+        """Return the cached value for key, calling loader() on a miss, expiry or version change"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generation
+
+        # Load outside the lock so a slow query does not block other keys, and never from a replica
+        with primary_reads():
+            value = loader()
+        max_entries = current_app.config.get('REFERENCE_CACHE_SIZE', 1024)
+        ttl = current_app.config.get('REFERENCE_CACHE_TTL', 300)
+
+        with self._lock:
+            if generation != self._generation:
+                return value  # Invalidated while loading; the value may already be stale
+            self._entries[key] = (time.monotonic() + ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def invalidate(self, *kinds):
+        """Drop entries whose key starts with one of kinds; no kinds clears everything"""
+        with self._lock:
+            keys = [key for key in self._entries if not kinds or key[0] in kinds]
+            for key in keys:
+                del self._entries[key]
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        """Report hit/miss counters and the number of cached entries"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+
+reference_cache = ReferenceCache()
+
+
+def _skills_version():
+    return request_versions([SKILLS])[SKILLS]
+
+
+def cached_skills():
+    """Every skill as a dict, ordered by id"""
+    return reference_cache.get_or_load(
+        ('skills',), lambda: [skill.to_dict() for skill in Skill.query.order_by(Skill.id).all()],
+        version=_skills_version()
+    )
+
+
+def cached_skill(skill_id):
+    """One skill as a dict, or None if it does not exist"""
+    def load():
+        skill = db.session.get(Skill, skill_id)
+        return skill.to_dict() if skill else None
+
+    return reference_cache.get_or_load(('skill', skill_id), load, version=_skills_version())
+
+
+def cached_skill_categories():
+    """Distinct non-null skill categories"""
+    return reference_cache.get_or_load(
+        ('categories',),
+        lambda: db.session.execute(
+            select(Skill.category).distinct().where(Skill.category.isnot(None))
+        ).scalars().all(),
+        version=_skills_version()
+    )
+
+
+def cached_role(role_id):
+    """One role as a dict, or None if it does not exist"""
+    def load():
+        role = db.session.get(Role, role_id)
+        return role.to_dict() if role else None
+
+    return reference_cache.get_or_load(('role', role_id), load)
+
+
+def cached_role_requirements(role_id):
+    """{skill_id: required_level} for a role"""
+    return reference_cache.get_or_load(
+        ('role_requirements', role_id),
+        lambda: dict(db.session.execute(
+            select(role_skills.c.skill_id, role_skills.c.required_level)
+            .where(role_skills.c.role_id == role_id)
+            .order_by(role_skills.c.skill_id)
+        ).all())
+    )
+
+
+def invalidate_skills():
+    """Forget cached skills and categories after a skill write"""
+    reference_cache.invalidate('skills', 'skill', 'categories')
+
+
+@event.listens_for(Role.required_skills, 'append')
+@event.listens_for(Role.required_skills, 'remove')
+def _role_requirements_changed(role, skill, initiator):
+    """Role requirement edits change the cached requirement maps"""
+    reference_cache.invalidate('role_requirements')
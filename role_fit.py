@@ -0,0 +1,94 @@
+"""
+Role-fit ranking of internal candidates.
+
+Scores every employee against one role's requirements by slicing the
+cached skill matrix to that role's required skill columns. Missing levels,
+open gaps and High-priority gaps (the gap engine's rules) are row sums over
+an employees x required-skills gap matrix. ``np.argpartition`` then selects
+the top K without sorting everyone. Only the selected candidates get a full
+``score_gaps`` breakdown. A role that is not in the snapshot is unknown;
+the snapshot is already checked against the SKILL_MATRIX version, so a miss
+is never a reason to rebuild it.
+"""
+from src.gap_engine import build_gap_results, score_gaps
+from src.lazy_imports import lazy_import
+from src.skill_matrix import skill_matrix
+
+np = lazy_import('numpy')
+
+
+def rank_role_candidates(role_id, top_k=10, department=None, include_current=False):
+    """Return (candidates, considered) for the employees closest to meeting a role's requirements
+
+    Candidates are ordered by fewest missing proficiency levels, then fewest
+    High-priority gaps, then employee id. Employees already in the role are
+    skipped unless include_current is set. Returns None if the role does not exist.
+    """
+    state = skill_matrix.snapshot()
+    role_row = state['role_index'].get(role_id)
+    if role_row is None:
+        return None
+
+    cols = np.flatnonzero(state['required'][role_row])
+    required = state['requirements'][role_row, cols].astype(np.int16)
+
+    # Candidate pool
+    mask = np.ones(len(state['employee_ids']), dtype=bool)
+    if not include_current:
+        mask &= state['employee_roles'] != role_row
+    if department is not None:
+        mask &= np.array([d == department for d in state['employee_departments']], dtype=bool)
+    rows = np.flatnonzero(mask)
+    if not len(rows) or not len(cols):
+        return [], len(rows)
+
+    gap = state['proficiency'][np.ix_(rows, cols)].astype(np.int16) - required
+    shortfall = np.maximum(-gap, 0).sum(axis=1, dtype=np.int64)
+    high_priority = (gap <= -2).sum(axis=1)
+    open_gaps = (gap < 0).sum(axis=1)
+
+    # Single integer key: shortfall first, High-priority count as the tie-breaker
+    key = shortfall * (len(cols) + 1) + high_priority
+    top_k = min(top_k, len(rows))
+    selected = np.argpartition(key, top_k - 1)[:top_k] if top_k < len(rows) else np.arange(len(rows))
+    selected = selected[np.lexsort((state['employee_ids'][rows[selected]], key[selected]))]
+
+    # Gap breakdown for the selected candidates only, with the engine's scoring rules
+    chosen = rows[selected]
+    employee_rows = np.repeat(chosen, len(cols))
+    skill_cols = np.tile(cols, len(chosen))
+    inputs = {
+        'employee_id': state['employee_ids'][employee_rows],
+        'employee_name': [state['employee_names'][i] for i in employee_rows.tolist()],
+        'skill_id': state['skill_ids'][skill_cols],
+        'skill_name': [state['skill_names'][i] for i in skill_cols.tolist()],
+        'skill_category': [state['skill_categories'][i] for i in skill_cols.tolist()],
+        'required_level': np.tile(required, len(chosen)).astype(np.int64),
+        'current_level': state['proficiency'][employee_rows, skill_cols].astype(np.int64)
+    }
+    breakdown = build_gap_results(inputs, score_gaps(
+        inputs['current_level'], inputs['required_level'], inputs['skill_id'], inputs['skill_category']
+    ))
+
+    total_required = int(required.sum())
+    candidates = []
+    for position, (row, index) in enumerate(zip(chosen.tolist(), selected.tolist())):
+        gaps = breakdown[position * len(cols):(position + 1) * len(cols)]
+        for result in gaps:
+            del result['employee_id'], result['employee_name']
+        role_index = int(state['employee_roles'][row])
+
+        candidates.append({
+            'employee_id': int(state['employee_ids'][row]),
+            'employee_name': state['employee_names'][row],
+            'department': state['employee_departments'][row],
+            'current_role_id': int(state['role_ids'][role_index]) if role_index >= 0 else None,
+            'readiness': round(1 - int(shortfall[index]) / total_required, 3) if total_required else 1.0,
+            'missing_levels': int(shortfall[index]),
+            'open_gaps': int(open_gaps[index]),
+            'high_priority_gaps': int(high_priority[index]),
+            'predicted_training_time': sum(result['predicted_training_time'] for result in gaps),
+            'skill_gaps': gaps
+        })
+
+    return candidates, len(rows)
@@ -0,0 +1,307 @@
+"""
+In-process dense skill matrix cache for read-side analytics.
+
+Proficiencies are held as an employee x skill int8 matrix and role
+requirements as a role x skill int8 matrix, with id <-> index maps built
+once per load. Write endpoints patch single cells where they can and
+invalidate the cache otherwise; the next read rebuilds it.
+
+Every write to the matrix inputs also bumps the ``skill_matrix`` version
+counter. Each snapshot compares it with the version the matrices were
+built from, so writes by other worker processes or by bulk_import.py
+trigger a rebuild instead of serving stale proficiencies. The counter and
+the matrices are always read from the primary, never from a read replica.
+"""
+import sys
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from src.app import db
+from src.database import primary_reads
+from src.models import Employee, Role, Skill, employee_skills, role_skills
+from src.gap_engine import DEFAULT_REQUIRED_LEVEL
+from src.lazy_imports import lazy_import
+from src.versioning import SKILL_MATRIX, bump_versions, current_versions
+
+np = lazy_import('numpy')
+
+
+class SkillMatrixCache:
+    """Thread-safe, lazily built employee/role x skill matrices"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._state = None
+        self._built_at = None
+        self._version = None  # skill_matrix counter the state reflects
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.patches = 0
+        self.invalidations = 0
+        self._patch_listeners = []
+
+    def add_patch_listener(self, listener):
+        """Call listener(employee_rows) after proficiency cells are patched in place"""
+        self._patch_listeners.append(listener)
+
+    def _notify_patch(self, rows):
+        for listener in self._patch_listeners:
+            listener(rows)
+
+    def _load(self):
+        """Read the relational tables into dense arrays"""
+        employees = db.session.execute(
+            select(Employee.id, Employee.role_id, Employee.first_name, Employee.last_name, Employee.department)
+            .order_by(Employee.id)
+        ).all()
+        skills = db.session.execute(select(Skill.id, Skill.name, Skill.category).order_by(Skill.id)).all()
+        role_ids = db.session.execute(select(Role.id).order_by(Role.id)).scalars().all()
+
+        employee_index = {row[0]: i for i, row in enumerate(employees)}
+        skill_index = {row[0]: i for i, row in enumerate(skills)}
+        role_index = {role_id: i for i, role_id in enumerate(role_ids)}
+
+        proficiency = np.zeros((len(employees), len(skills)), dtype=np.int8)
+        cells = _cells(db.session.execute(select(
+            employee_skills.c.employee_id, employee_skills.c.skill_id, employee_skills.c.proficiency_level
+        )), employee_index, skill_index, default=0)
+        proficiency[cells[0], cells[1]] = cells[2]
+
+        requirements = np.zeros((len(role_ids), len(skills)), dtype=np.int8)
+        required = np.zeros((len(role_ids), len(skills)), dtype=bool)
+        cells = _cells(db.session.execute(select(
+            role_skills.c.role_id, role_skills.c.skill_id, role_skills.c.required_level
+        )), role_index, skill_index, default=DEFAULT_REQUIRED_LEVEL)
+        requirements[cells[0], cells[1]] = cells[2]
+        required[cells[0], cells[1]] = True
+
+        return {
+            'employee_ids': np.array([row[0] for row in employees], dtype=np.int64),
+            'employee_names': [f"{row[2]} {row[3]}" for row in employees],
+            'employee_departments': [row[4] for row in employees],
+            'employee_roles': np.array(
+                [role_index.get(row[1], -1) for row in employees], dtype=np.int32
+            ),
+            'skill_ids': np.array([row[0] for row in skills], dtype=np.int64),
+            'skill_names': [row[1] for row in skills],
+            'skill_categories': [row[2] for row in skills],
+            'role_ids': np.array(role_ids, dtype=np.int64),
+            'employee_index': employee_index,
+            'skill_index': skill_index,
+            'role_index': role_index,
+            'proficiency': proficiency,
+            'requirements': requirements,
+            'required': required
+        }
+
+    def _expired(self):
+        ttl = current_app.config.get('SKILL_MATRIX_TTL', 0)
+        return bool(ttl) and time.monotonic() - self._built_at > ttl
+
+    @staticmethod
+    def _current_version():
+        with primary_reads():
+            return current_versions([SKILL_MATRIX])[SKILL_MATRIX]
+
+    def snapshot(self):
+        """Return the current matrices, building them on a miss or after an unseen write"""
+        with self._lock:
+            version = self._current_version()  # Read before loading, so a racing write forces a rebuild
+            if self._state is None or self._expired() or version != self._version:
+                self.misses += 1
+                with primary_reads():
+                    self._state = self._load()
+                self._version = version
+                self._built_at = time.monotonic()
+                self.builds += 1
+            else:
+                self.hits += 1
+            return self._state
+
+    def invalidate(self):
+        """Drop the matrices; the next read rebuilds them"""
+        with self._lock:
+            if self._state is not None:
+                self.invalidations += 1
+            self._state = None
+
+    def _accept_patch(self):
+        """Advance to the committed version if the caller's write is the only one since the build
+
+        Patch callers commit exactly one skill_matrix bump first. Any other
+        write in between means the state misses changes, so it is dropped.
+        """
+        version = self._current_version()
+        if version != self._version + 1:
+            self.invalidate()
+            return False
+        self._version = version
+        return True
+
+    def patch_proficiency(self, employee_id, skill_id, level):
+        """Update one proficiency cell in place, or invalidate if it is unknown"""
+        with self._lock:
+            state = self._state
+            if state is None:
+                return
+            row = state['employee_index'].get(employee_id)
+            col = state['skill_index'].get(skill_id)
+            if row is None or col is None:
+                self.invalidate()
+                return
+            if not self._accept_patch():
+                return
+            state['proficiency'][row, col] = level or 0
+            self.patches += 1
+            self._notify_patch(np.array([row], dtype=np.int64))
+
+    def patch_proficiencies(self, levels):
+        """Apply many (employee_id, skill_id, level) updates; invalidate on unknown ids"""
+        with self._lock:
+            state = self._state
+            if state is None or not levels:
+                return
+            rows, cols, values = _cells(levels, state['employee_index'], state['skill_index'], default=0)
+            if len(rows) != len(levels):
+                self.invalidate()
+                return
+            if not self._accept_patch():
+                return
+            state['proficiency'][rows, cols] = values
+            self.patches += len(levels)
+            self._notify_patch(rows)
+
+    def patch_employee_role(self, employee_id, role_id):
+        """Reassign an employee's role row, or invalidate if it is unknown"""
+        with self._lock:
+            state = self._state
+            if state is None:
+                return
+            row = state['employee_index'].get(employee_id)
+            role_row = -1 if role_id is None else state['role_index'].get(role_id)
+            if row is None or role_row is None:
+                self.invalidate()
+                return
+            if not self._accept_patch():
+                return
+            state['employee_roles'][row] = role_row
+            self.patches += 1
+
+    def gap_inputs(self, employee_ids=None):
+        """Build gap engine inputs by slicing the matrices (no SQL on a hit)"""
+        state = self.snapshot()
+
+        if employee_ids is None:
+            rows = np.arange(len(state['employee_ids']))
+        else:
+            index = state['employee_index']
+            rows = np.array([index[e] for e in employee_ids if e in index], dtype=np.int64)
+
+        roles = state['employee_roles'][rows]
+        rows, roles = rows[roles >= 0], roles[roles >= 0]
+
+        # Row-major nonzero keeps the engine's (employee, skill id) ordering
+        positions, cols = np.nonzero(state['required'][roles])
+        employee_rows = rows[positions]
+        role_rows = roles[positions]
+
+        return {
+            'employee_id': state['employee_ids'][employee_rows],
+            'employee_name': [state['employee_names'][i] for i in employee_rows.tolist()],
+            'skill_id': state['skill_ids'][cols],
+            'skill_name': [state['skill_names'][i] for i in cols.tolist()],
+            'skill_category': [state['skill_categories'][i] for i in cols.tolist()],
+            'required_level': state['requirements'][role_rows, cols].astype(np.int64),
+            'current_level': state['proficiency'][employee_rows, cols].astype(np.int64)
+        }
+
+    def stats(self):
+        """Report hit/miss counters and the memory held by the matrices, index maps and label lists"""
+        with self._lock:
+            state = self._state
+            lookups = self.hits + self.misses
+            stats = {
+                'loaded': state is not None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'builds': self.builds,
+                'patches': self.patches,
+                'invalidations': self.invalidations,
+                'employees': 0,
+                'skills': 0,
+                'roles': 0,
+                'version': self._version,
+                'array_bytes': 0,
+                'memory_bytes': 0
+            }
+            if state is not None:
+                stats.update({
+                    'employees': len(state['employee_ids']),
+                    'skills': len(state['skill_ids']),
+                    'roles': len(state['role_ids']),
+                    'array_bytes': sum(
+                        value.nbytes for value in state.values() if isinstance(value, np.ndarray)
+                    ),
+                    'memory_bytes': _state_size(state)
+                })
+            return stats
+
+
+def _state_size(state):
+    """Approximate bytes held by a state: array buffers plus dicts, lists and the objects they hold"""
+    seen = set()
+
+    def size(value):
+        if id(value) in seen:
+            return 0  # Shared strings (e.g. department names) are counted once
+        seen.add(id(value))
+        return sys.getsizeof(value)
+
+    total = 0
+    for value in state.values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif isinstance(value, dict):
+            total += size(value) + sum(size(key) + size(item) for key, item in value.items())
+        else:
+            total += size(value) + sum(size(item) for item in value)
+    return total
+
+
+def _cells(rows, row_index, col_index, default):
+    """Map (row id, column id, level) tuples to index arrays, skipping unknown ids"""
+    row_positions, col_positions, levels = [], [], []
+    for row_id, col_id, level in rows:
+        row, col = row_index.get(row_id), col_index.get(col_id)
+        if row is not None and col is not None:
+            row_positions.append(row)
+            col_positions.append(col)
+            levels.append(default if level is None else level)
+
+    return (
+        np.array(row_positions, dtype=np.int64),
+        np.array(col_positions, dtype=np.int64),
+        np.array(levels, dtype=np.int8)
+    )
+
+
+skill_matrix = SkillMatrixCache()
+
+
+@event.listens_for(Role.required_skills, 'append')
+@event.listens_for(Role.required_skills, 'remove')
+def _role_requirements_changed(role, skill, initiator):
+    """Role requirement edits reshape the role x skill matrix"""
+    skill_matrix.invalidate()
+    db.session.info['skill_matrix_changed'] = True
+
+
+@event.listens_for(Session, 'before_commit')
+def _publish_role_requirement_edits(session):
+    """Bump the skill_matrix counter for relationship edits so other processes rebuild too"""
+    if session.info.pop('skill_matrix_changed', False):
+        bump_versions(SKILL_MATRIX)
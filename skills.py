@@ -1,34 +1,60 @@
 from flask import Blueprint, request, jsonify
 from src.app import db
 from src.models import Skill
+from src.pagination import keyset_slice, next_cursor, parse_fields
+from src.query_budget import query_budget
+from src.reference_cache import cached_skill, cached_skill_categories, cached_skills, invalidate_skills
+from src.skill_matrix import skill_matrix
+from src.versioning import SKILL_MATRIX, SKILLS, bump_versions, conditional_get
 
 skills_bp = Blueprint('skills', __name__)
 
+SKILL_FIELDS = ('id', 'name', 'description', 'category', 'created_at')
+
 @skills_bp.route('', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(SKILLS)
 def get_skills():
     """Get all skills with optional filtering"""
     try:
         category = request.args.get('category')
+        fields = parse_fields(request.args.get('fields'), SKILL_FIELDS)
         
-        query = Skill.query
+        # Served from the reference-data cache; filtering and paging happen in memory
+        skills = cached_skills()
         
         if category:
-            query = query.filter(Skill.category == category)
+            skills = [skill for skill in skills if skill['category'] == category]
+        
+        skills, limit = keyset_slice(
+            skills,
+            after_id=request.args.get('after_id', type=int),
+            limit=request.args.get('limit', type=int)
+        )
         
-        skills = query.all()
         return jsonify({
-            'skills': [skill.to_dict() for skill in skills],
-            'count': len(skills)
+            'skills': [
+                {key: value for key, value in skill.items() if fields is None or key in fields}
+                for skill in skills
+            ],
+            'count': len(skills),
+            'next_after_id': next_cursor(skills, limit)
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @skills_bp.route('/<int:skill_id>', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(SKILLS)
 def get_skill(skill_id):
     """Get a specific skill by ID"""
     try:
-        skill = Skill.query.get_or_404(skill_id)
-        return jsonify(skill.to_dict())
+        skill = cached_skill(skill_id)
+        if skill is None:
+            return jsonify({'error': 'Resource not found'}), 404
+        return jsonify(skill)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -55,7 +81,10 @@ def create_skill():
         )
         
         db.session.add(skill)
+        bump_versions(SKILLS, SKILL_MATRIX)
         db.session.commit()
+        skill_matrix.invalidate()
+        invalidate_skills()
         
         return jsonify(skill.to_dict()), 201
     except Exception as e:
@@ -74,7 +103,15 @@ def update_skill(skill_id):
             if field in data:
                 setattr(skill, field, data[field])
         
+        matrix_changed = 'name' in data or 'category' in data
+        entities = [SKILLS]
+        if matrix_changed:
+            entities.append(SKILL_MATRIX)  # Skill names and categories are held by the skill matrix
+        bump_versions(*entities)
         db.session.commit()
+        invalidate_skills()
+        if matrix_changed:
+            skill_matrix.invalidate()  # Cached skill names and categories are stale
         return jsonify(skill.to_dict())
     except Exception as e:
         db.session.rollback()
@@ -86,21 +123,22 @@ def delete_skill(skill_id):
     try:
         skill = Skill.query.get_or_404(skill_id)
         db.session.delete(skill)
+        bump_versions(SKILLS, SKILL_MATRIX)
         db.session.commit()
+        skill_matrix.invalidate()
+        invalidate_skills()
         return jsonify({'message': 'Skill deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @skills_bp.route('/categories', methods=['GET'])
+@query_budget(max_queries=2)
+@conditional_get(SKILLS)
 def get_skill_categories():
     """Get all unique skill categories"""
     try:
-        categories = db.session.query(Skill.category).distinct().filter(
-            Skill.category.isnot(None)
-        ).all()
-        
-        category_list = [category[0] for category in categories]
+        category_list = list(cached_skill_categories())
         return jsonify({
             'categories': category_list,
             'count': len(category_list)
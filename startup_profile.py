@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for the API process.
+
+Runs ``create_app()`` in fresh interpreters and reports:
+  - the slowest imports, from ``python -X importtime``
+  - the median cold-start time of importing and creating the app
+  - which heavy libraries (NumPy, pandas, scikit-learn, ...) were loaded at boot
+
+With --check the script exits with status 1 when the median cold start is
+over STARTUP_TIME_BUDGET_MS or a heavy library was imported at boot, so it
+can gate CI.
+
+Usage:
+    python startup_profile.py --top 25
+    python startup_profile.py --check --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Add the project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from config.config import config
+from src.lazy_imports import HEAVY_MODULES
+
+BOOT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+from src.app import create_app
+create_app({config_name!r})
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{
+    'elapsed_ms': elapsed_ms,
+    'heavy_modules': sorted(m for m in {heavy!r} if m in sys.modules)
+}}))
+"""
+
+
+def _boot_code(config_name):
+    return BOOT_SCRIPT.format(root=PROJECT_ROOT, config_name=config_name, heavy=HEAVY_MODULES)
+
+
+def import_profile(config_name, top):
+    """Return the top imports by cumulative time as (cumulative_us, self_us, module) tuples"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _boot_code(config_name)],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+    )
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|', 2)
+        entries.append((int(cumulative_us), int(self_us), module.rstrip()))
+
+    return sorted(entries, reverse=True)[:top]
+
+
+def cold_start(config_name, runs):
+    """Boot the app runs times in fresh interpreters; return (timings in ms, heavy modules)"""
+    timings = []
+    heavy_modules = set()
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-c', _boot_code(config_name)],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(result['elapsed_ms'])
+        heavy_modules.update(result['heavy_modules'])
+
+    return timings, sorted(heavy_modules)
+
+
+def main():
+    """Print the import profile and cold-start summary; enforce the budget with --check"""
+    parser = argparse.ArgumentParser(description='Profile API cold start and import times')
+    parser.add_argument('--config', default='default', help='Configuration name (development, production, testing)')
+    parser.add_argument('--top', type=int, default=20, help='Number of slowest imports to list')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts to time')
+    parser.add_argument('--budget-ms', type=float, help='Override STARTUP_TIME_BUDGET_MS')
+    parser.add_argument('--check', action='store_true', help='Exit 1 when the budget is exceeded')
+    args = parser.parse_args()
+
+    budget_ms = args.budget_ms or config[args.config].STARTUP_TIME_BUDGET_MS
+
+    print("=" * 70)
+    print("SLOWEST IMPORTS (python -X importtime)")
+    print("=" * 70)
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative_us, self_us, module in import_profile(args.config, args.top):
+        print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {module}")
+
+    timings, heavy_modules = cold_start(args.config, args.runs)
+    median_ms = statistics.median(timings)
+
+    print("=" * 70)
+    print("COLD START")
+    print("=" * 70)
+    print(f"{'Runs':<28}{args.runs:>10}")
+    print(f"{'Median create_app() ms':<28}{median_ms:>10.1f}")
+    print(f"{'Fastest create_app() ms':<28}{min(timings):>10.1f}")
+    print(f"{'Budget ms':<28}{budget_ms:>10.1f}")
+    print(f"{'Heavy modules at boot':<28}{', '.join(heavy_modules) or 'none':>10}")
+    print("=" * 70)
+
+    if not args.check:
+        return
+
+    failures = []
+    if median_ms > budget_ms:
+        failures.append(f"median cold start {median_ms:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+    if heavy_modules:
+        failures.append(f"heavy modules imported at boot: {', '.join(heavy_modules)}")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+    print("Startup budget OK")
+
+
+if __name__ == '__main__':
+    main()
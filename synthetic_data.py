@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic organisation generator.
+
+Produces skills, roles and employees in the same shape as
+sample_skills.json, sample_roles.json and sample_employees.json, so the
+output can be fed to bulk_import.py or the benchmark suite. The same seed
+and sizes always produce the same data.
+
+Usage:
+    python synthetic_data.py --employees 20000 --skills 200 --roles 40 --density 0.15 --out data/synthetic
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+
+CATEGORIES = ['Technical', 'Soft Skills', 'Domain Knowledge', 'Leadership', 'Tools']
+DEPARTMENTS = ['Engineering', 'Data Science', 'Marketing', 'HR', 'Finance', 'Operations', 'Sales']
+LEVELS = ['Junior', 'Mid', 'Senior', 'Lead']
+FIRST_NAMES = ['Rahul', 'Priya', 'Amit', 'Sneha', 'Vikram', 'Anita', 'Arjun', 'Kavya', 'Rohan', 'Meera']
+LAST_NAMES = ['Sharma', 'Patel', 'Kumar', 'Reddy', 'Singh', 'Desai', 'Iyer', 'Nair', 'Gupta', 'Joshi']
+
+
+def generate_org(employees=1000, skills=50, roles=10, density=0.2, role_skills=6, seed=42):
+    """Generate (skills, roles, employees) record lists
+
+    density is the fraction of all skills each employee has a rating for;
+    role_skills is the number of required skills per role.
+    """
+    rng = random.Random(seed)
+    role_skills = min(role_skills, skills)
+
+    skill_records = [
+        {
+            'name': f'Skill {i:05d}',
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'description': f'Synthetic skill {i}'
+        }
+        for i in range(skills)
+    ]
+    skill_names = [record['name'] for record in skill_records]
+
+    role_records = []
+    for i in range(roles):
+        department = DEPARTMENTS[i % len(DEPARTMENTS)]
+        role_records.append({
+            'title': f'Role {i:04d}',
+            'description': f'Synthetic role {i}',
+            'department': department,
+            'level': LEVELS[i % len(LEVELS)],
+            'required_skills': [
+                {'skill_name': name, 'required_level': rng.randint(2, 5)}
+                for name in rng.sample(skill_names, role_skills)
+            ]
+        })
+
+    skills_per_employee = max(1, int(round(density * skills)))
+    start = date(2015, 1, 1)
+    employee_records = []
+    for i in range(employees):
+        role = role_records[rng.randrange(roles)] if roles else None
+
+        # Bias ratings toward the employee's role requirements so gaps look realistic
+        rated = [req['skill_name'] for req in role['required_skills']] if role else []
+        rated = rng.sample(rated, min(len(rated), skills_per_employee // 2 + 1))
+        remaining = [name for name in rng.sample(skill_names, min(skills, skills_per_employee * 2))
+                     if name not in rated]
+        rated += remaining[:max(0, skills_per_employee - len(rated))]
+
+        employee_records.append({
+            'employee_id': f'SYN{i:07d}',
+            'first_name': FIRST_NAMES[i % len(FIRST_NAMES)],
+            'last_name': LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)],
+            'email': f'synthetic.{i}@company.com',
+            'department': role['department'] if role else rng.choice(DEPARTMENTS),
+            'hire_date': (start + timedelta(days=rng.randrange(3650))).isoformat(),
+            'role': role['title'] if role else None,
+            'skills': [
+                {'skill_name': name, 'proficiency_level': rng.randint(1, 5)}
+                for name in rated
+            ]
+        })
+
+    return skill_records, role_records, employee_records
+
+
+def write_org(out_dir, skill_records, role_records, employee_records):
+    """Write the generated records as JSON files; return their paths"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = {}
+    for name, records in (('skills', skill_records), ('roles', role_records), ('employees', employee_records)):
+        paths[name] = os.path.join(out_dir, f'synthetic_{name}.json')
+        with open(paths[name], 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a deterministic synthetic organisation')
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--skills', type=int, default=50)
+    parser.add_argument('--roles', type=int, default=10)
+    parser.add_argument('--density', type=float, default=0.2, help='Fraction of skills rated per employee')
+    parser.add_argument('--role-skills', type=int, default=6, help='Required skills per role')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='data/synthetic', help='Output directory')
+    args = parser.parse_args()
+
+    paths = write_org(args.out, *generate_org(
+        employees=args.employees,
+        skills=args.skills,
+        roles=args.roles,
+        density=args.density,
+        role_skills=args.role_skills,
+        seed=args.seed
+    ))
+
+    for name, path in paths.items():
+        print(f"Wrote {name} to {path}")
+
+
+if __name__ == '__main__':
+    main()
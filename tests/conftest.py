@@ -0,0 +1,99 @@
+"""
+Shared pytest fixtures.
+
+The ``app`` fixture (used by pytest-flask's ``client``) is one TestingConfig
+application per session on a throwaway SQLite database, seeded with a small
+org and one full gap analysis run. TestingConfig sets QUERY_BUDGET_MODE to
+'raise', so every request made through ``client`` is checked against its
+endpoint's @query_budget.
+"""
+import os
+import sys
+from datetime import date
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.config import config
+from src.app import create_app, db
+from src.models import Employee, Role, Skill, employee_skills, role_skills
+
+pytest_plugins = ['src.query_budget_plugin']
+
+SKILLS = [
+    ('Python', 'Programming'),
+    ('SQL', 'Data'),
+    ('Machine Learning', 'Data'),
+    ('Communication', 'Soft Skills')
+]
+
+# Role title, department, level, {skill: required level}
+ROLES = [
+    ('Data Scientist', 'Data Science', 'Senior', {'Python': 4, 'SQL': 3, 'Machine Learning': 4}),
+    ('Software Engineer', 'Engineering', 'Mid', {'Python': 4, 'SQL': 2, 'Communication': 3})
+]
+
+# First name, last name, department, role title, {skill: proficiency}
+EMPLOYEES = [
+    ('Asha', 'Rao', 'Data Science', 'Data Scientist', {'Python': 3, 'SQL': 4, 'Machine Learning': 2}),
+    ('Ben', 'Ortiz', 'Data Science', 'Data Scientist', {'Python': 5, 'SQL': 5, 'Machine Learning': 5}),
+    ('Chen', 'Li', 'Engineering', 'Software Engineer', {'Python': 2, 'SQL': 1}),
+    ('Dana', 'Kim', 'Engineering', 'Software Engineer', {'Python': 5, 'SQL': 4, 'Communication': 4}),
+    ('Eli', 'Stone', 'Engineering', None, {'Communication': 5})
+]
+
+
+def _seed():
+    skills = {}
+    for name, category in SKILLS:
+        skills[name] = Skill(name=name, category=category, description=f'{name} skills')
+        db.session.add(skills[name])
+    db.session.flush()
+
+    roles = {}
+    for title, department, level, requirements in ROLES:
+        roles[title] = Role(title=title, department=department, level=level)
+        db.session.add(roles[title])
+        db.session.flush()
+        db.session.execute(role_skills.insert(), [
+            {'role_id': roles[title].id, 'skill_id': skills[name].id, 'required_level': level}
+            for name, level in requirements.items()
+        ])
+
+    for index, (first_name, last_name, department, title, levels) in enumerate(EMPLOYEES, start=1):
+        employee = Employee(
+            employee_id=f'EMP{index:03d}',
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{first_name.lower()}@example.com',
+            department=department,
+            hire_date=date(2020, index, 1),
+            role_id=roles[title].id if title else None
+        )
+        db.session.add(employee)
+        db.session.flush()
+        db.session.execute(employee_skills.insert(), [
+            {'employee_id': employee.id, 'skill_id': skills[name].id, 'proficiency_level': level}
+            for name, level in levels.items()
+        ])
+
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """Testing application on a seeded, analyzed SQLite database"""
+    database = tmp_path_factory.mktemp('db') / 'skills_gap_analyzer.db'
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config['testing'], 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{database}')
+        app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        _seed()
+
+    response = app.test_client().post('/api/analysis/gaps', json={})
+    assert response.status_code == 200, response.get_json()
+
+    return app
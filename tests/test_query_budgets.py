@@ -0,0 +1,94 @@
+"""
+Endpoint SQL query budgets.
+
+Requests go through pytest-flask's ``client`` under TestingConfig
+(QUERY_BUDGET_MODE='raise'), so an endpoint that issues more statements
+than its @query_budget, or repeats one statement shape more than
+N_PLUS_ONE_THRESHOLD times, fails with QueryBudgetExceeded. The in-process
+caches are cleared before each test so every request takes its cold,
+most query-heavy path.
+"""
+import pytest
+from sqlalchemy import select
+from src.app import db
+from src.models import Employee
+from src.query_budget import QueryTracker
+from src.reference_cache import reference_cache
+from src.skill_matrix import skill_matrix
+
+READ_ENDPOINTS = [
+    '/api/employees',
+    '/api/employees?department=Engineering&limit=2&fields=first_name,department',
+    '/api/employees/1',
+    '/api/employees/1/skills',
+    '/api/skills',
+    '/api/skills/1',
+    '/api/skills/categories',
+    '/api/analysis/gaps/1',
+    '/api/analysis/gaps/1/live',
+    '/api/analysis/gaps/1/1/mentors',
+    '/api/analysis/roles/1/candidates',
+    '/api/analysis/heatmap',
+    '/api/analysis/heatmap?group_by=category',
+    '/api/analysis/predictions/1',
+    '/api/analysis/trends/org',
+    '/api/analysis/trends/departments/Engineering',
+    '/api/analysis/trends/employees/1',
+    '/api/analysis/export?format=csv'
+]
+
+BATCH_ENDPOINTS = [
+    ('/api/employees/skills/batch', {'employee_ids': [1, 2, 3, 4, 5]}),
+    ('/api/analysis/predictions/batch', {'department': 'Engineering', 'include_predictions': True}),
+    ('/api/analysis/recommendations', {}),
+    ('/api/analysis/recommendations', {'top_k': 2})
+]
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    skill_matrix.invalidate()
+    reference_cache.invalidate()
+
+
+@pytest.mark.parametrize('url', READ_ENDPOINTS)
+def test_read_endpoint_within_budget(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('url, payload', BATCH_ENDPOINTS)
+def test_batch_endpoint_within_budget(client, url, payload):
+    response = client.post(url, json=payload)
+    assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def test_revalidation_costs_one_query(client, assert_max_queries):
+    etag = client.get('/api/employees').headers['ETag']
+
+    with assert_max_queries(1):
+        response = client.get('/api/employees', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.query_budget(3)
+def test_employee_detail_marker(client):
+    assert client.get('/api/employees/2').status_code == 200
+
+
+def test_tracker_flags_budget_and_repeated_shapes():
+    tracker = QueryTracker()
+    for skill_id in range(3):
+        tracker.record(f'SELECT * FROM skill WHERE skill.id = {skill_id}')
+
+    messages = tracker.violations(max_queries=2, repeat_threshold=2)
+    assert len(messages) == 2
+    assert messages[0] == '3 SQL statements exceed the budget of 2'
+    assert messages[1].startswith('Repeated 3x (N+1?)')
+
+
+def test_assert_max_queries_fails_over_budget(app, assert_max_queries):
+    with pytest.raises(pytest.fail.Exception, match='exceed the budget of 1'):
+        with assert_max_queries(1):
+            for employee_id in (1, 2):
+                db.session.execute(select(Employee.id).where(Employee.id == employee_id)).all()
@@ -0,0 +1,50 @@
+"""
+Cold-start budget.
+
+Each measurement boots the app in a fresh interpreter, because this test
+process has already imported the heavy libraries that requests load on
+first use. The median create_app() time must stay within
+STARTUP_TIME_BUDGET_MS, and none of HEAVY_MODULES may be imported at boot.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from config.config import config
+from src.lazy_imports import HEAVY_MODULES
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_NAME = 'testing'
+RUNS = 3
+
+BOOT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {PROJECT_ROOT!r})
+from src.app import create_app
+create_app({CONFIG_NAME!r})
+print(json.dumps({{
+    'elapsed_ms': (time.perf_counter() - started) * 1000,
+    'heavy_modules': sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)
+}}))
+"""
+
+
+def _cold_start():
+    completed = subprocess.run(
+        [sys.executable, '-c', BOOT_SCRIPT], capture_output=True, text=True, cwd=PROJECT_ROOT, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_create_app_within_startup_budget():
+    boots = [_cold_start() for _ in range(RUNS)]
+    median_ms = statistics.median(boot['elapsed_ms'] for boot in boots)
+    budget_ms = config[CONFIG_NAME].STARTUP_TIME_BUDGET_MS
+
+    assert median_ms <= budget_ms, f'median cold start {median_ms:.1f} ms exceeds the {budget_ms} ms budget'
+
+
+def test_create_app_does_not_import_heavy_modules():
+    assert _cold_start()['heavy_modules'] == []
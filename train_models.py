@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Offline training for the training-time model.
+
+Fits the model on completed TrainingRecord history, reports hold-out
+metrics and writes it with joblib to MODEL_PATH/training_time.joblib.
+Running API processes pick the new file up on their next mtime check
+(MODEL_RELOAD_INTERVAL); re-run gap analysis to refresh stored
+predicted_training_time values.
+
+Usage:
+    python train_models.py
+    python train_models.py --alpha 0.5 --min-samples 50 --output models/training_time.joblib
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.app import create_app, db
+from src.training_model import fetch_training_history, save_model, train_training_time_model
+from src.versioning import TRAINING_MODEL, bump_versions
+
+
+def main():
+    """Train the training-time model and save it under MODEL_PATH"""
+    parser = argparse.ArgumentParser(description='Train the training-time prediction model')
+    parser.add_argument('--alpha', type=float, default=1.0, help='Ridge regularisation strength')
+    parser.add_argument('--test-size', type=float, default=0.2, help='Hold-out fraction for metrics (0 to skip)')
+    parser.add_argument('--min-samples', type=int, default=20, help='Refuse to train on fewer completed trainings')
+    parser.add_argument('--output', help='Model file (default: MODEL_PATH/training_time.joblib)')
+    parser.add_argument('--config', default=None, help='Configuration name (development, production, testing)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        frame = fetch_training_history()
+        if len(frame) < args.min_samples:
+            print(f"Only {len(frame)} completed training records with dates; need at least {args.min_samples}.")
+            sys.exit(1)
+
+        bundle = train_training_time_model(frame, alpha=args.alpha, test_size=args.test_size)
+        path = save_model(bundle, args.output)
+
+        # Predictions ETags include the model counter, so clients revalidate
+        bump_versions(TRAINING_MODEL)
+        db.session.commit()
+
+    print("=" * 50)
+    print("TRAINING-TIME MODEL")
+    print("=" * 50)
+    print(f"{'Samples':<24}{bundle['samples']:>12,}")
+    for name, value in bundle['metrics'].items():
+        print(f"{name:<24}{value:>12}")
+    print(f"{'Experience factors':<24}{bundle['experience_factors']}")
+    print(f"{'Role level factors':<24}{bundle['role_level_factors']}")
+    print(f"{'Saved to':<24}{path}")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
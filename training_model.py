@@ -0,0 +1,261 @@
+"""
+Training-time model: offline training, cached loading and batch inference.
+
+``train_training_time_model`` fits a scikit-learn pipeline on completed
+``TrainingRecord`` history and ``save_model`` persists it with joblib under
+MODEL_PATH. Each completed training counts as closing one proficiency
+level. Its duration (start to end date, at TRAINING_HOURS_PER_WEEK) is the
+target, and its effectiveness_score is the sample weight. One-hot skill and
+skill-category features under ridge regularisation shrink rarely trained
+skills toward their category mean. The bundle also stores experience and
+role-level factors learned from the residuals.
+
+``model_store`` loads the bundle once per process and reloads it when the
+file's mtime changes (checked at most every MODEL_RELOAD_INTERVAL seconds).
+When no model is available, ``predict_training_hours`` falls back to
+TRAINING_HOURS_PER_LEVEL per missing level.
+"""
+import os
+import threading
+import time
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import select
+from src.app import db
+from src.lazy_imports import lazy_import
+from src.models import Employee, Role, Skill, TrainingRecord
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+joblib = lazy_import('joblib')
+
+MODEL_FILE = 'training_time.joblib'
+MODEL_FORMAT_VERSION = 1
+TRAINING_HOURS_PER_LEVEL = 20  # Heuristic fallback when no model is deployed
+FEATURE_COLUMNS = ['skill_id', 'skill_category']
+
+# Fallback adjustment factors when the model has not learned one for a bucket
+EXPERIENCE_BUCKETS = ((1, '<1y'), (3, '1-3y'), (7, '3-7y'), (None, '7y+'))
+DEFAULT_EXPERIENCE_FACTORS = {'<1y': 1.2, '1-3y': 1.1, '3-7y': 1.0, '7y+': 0.9}
+DEFAULT_ROLE_LEVEL_FACTORS = {'Junior': 1.15, 'Mid': 1.0, 'Senior': 0.9, 'Lead': 0.85}
+FACTOR_BOUNDS = (0.5, 2.0)
+
+
+def experience_bucket(hire_date, on=None):
+    """Tenure bucket label for a hire date (None when unknown)"""
+    if hire_date is None:
+        return None
+    on = on or date.today()
+    years = (on - hire_date).days / 365.25
+    for upper, label in EXPERIENCE_BUCKETS:
+        if upper is None or years < upper:
+            return label
+
+
+def _model_path(config=None):
+    config = config or current_app.config
+    return os.path.join(config.get('MODEL_PATH', 'models/'), MODEL_FILE)
+
+
+def fetch_training_history():
+    """Completed trainings with skill, tenure and role level attributes as a DataFrame"""
+    rows = db.session.execute(
+        select(
+            TrainingRecord.skill_id,
+            Skill.category,
+            TrainingRecord.start_date,
+            TrainingRecord.end_date,
+            TrainingRecord.effectiveness_score,
+            Employee.hire_date,
+            Role.level
+        ).join(
+            Skill, Skill.id == TrainingRecord.skill_id
+        ).join(
+            Employee, Employee.id == TrainingRecord.employee_id
+        ).outerjoin(
+            Role, Role.id == Employee.role_id
+        ).where(
+            TrainingRecord.completion_status == 'Completed',
+            TrainingRecord.start_date.isnot(None),
+            TrainingRecord.end_date.isnot(None),
+            TrainingRecord.end_date >= TrainingRecord.start_date
+        )
+    ).all()
+
+    hours_per_week = current_app.config.get('TRAINING_HOURS_PER_WEEK', 8)
+    return pd.DataFrame({
+        'skill_id': [row[0] for row in rows],
+        'skill_category': [row[1] or 'Uncategorized' for row in rows],
+        'hours': [max((row[3] - row[2]).days, 1) / 7 * hours_per_week for row in rows],
+        'weight': [(row[4] if row[4] is not None else 5.0) / 10 for row in rows],
+        'experience': [experience_bucket(row[5], on=row[2]) for row in rows],
+        'role_level': [row[6] for row in rows]
+    })
+
+
+def _learned_factors(frame, column, residual_ratio):
+    """Median actual/predicted hours per bucket, clipped to FACTOR_BOUNDS"""
+    ratios = residual_ratio.groupby(frame[column]).median()
+    return {str(bucket): round(float(np.clip(ratio, *FACTOR_BOUNDS)), 3) for bucket, ratio in ratios.items()}
+
+
+def train_training_time_model(frame, alpha=1.0, test_size=0.2, random_state=42):
+    """Fit the hours-per-level pipeline on a training history frame; return the model bundle"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import Ridge
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    def make_pipeline():
+        return Pipeline([
+            ('features', ColumnTransformer([
+                ('skill', OneHotEncoder(handle_unknown='ignore'), FEATURE_COLUMNS)
+            ])),
+            ('regressor', Ridge(alpha=alpha))
+        ])
+
+    features = frame[FEATURE_COLUMNS].astype({'skill_id': str})
+    metrics = {}
+    if len(frame) >= 10 and test_size:
+        train_x, test_x, train_y, test_y, train_w, _ = train_test_split(
+            features, frame['hours'], frame['weight'], test_size=test_size, random_state=random_state
+        )
+        holdout = make_pipeline().fit(train_x, train_y, regressor__sample_weight=train_w)
+        predicted = holdout.predict(test_x)
+        metrics = {
+            'mae_hours': round(float(mean_absolute_error(test_y, predicted)), 2),
+            'r2': round(float(r2_score(test_y, predicted)), 3),
+            'test_samples': int(len(test_y))
+        }
+
+    pipeline = make_pipeline().fit(features, frame['hours'], regressor__sample_weight=frame['weight'])
+    residual_ratio = frame['hours'] / np.maximum(pipeline.predict(features), 1.0)
+
+    return {
+        'format_version': MODEL_FORMAT_VERSION,
+        'trained_at': datetime.utcnow().isoformat(),
+        'samples': int(len(frame)),
+        'metrics': metrics,
+        'pipeline': pipeline,
+        'experience_factors': _learned_factors(frame, 'experience', residual_ratio),
+        'role_level_factors': _learned_factors(frame, 'role_level', residual_ratio)
+    }
+
+
+def save_model(bundle, path=None):
+    """Persist a bundle atomically so running processes never load a partial file"""
+    path = path or _model_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp'
+    joblib.dump(bundle, temp_path)
+    os.replace(temp_path, path)
+    return path
+
+
+class ModelStore:
+    """Per-process model cache that reloads when the file on disk changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bundle = None
+        self._path = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def get(self):
+        """Return the current model bundle, or None when no model is deployed"""
+        config = current_app.config
+        path = _model_path(config)
+        now = time.monotonic()
+        if path == self._path and now - self._checked_at < config.get('MODEL_RELOAD_INTERVAL', 30):
+            return self._bundle
+
+        with self._lock:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if path != self._path or mtime != self._mtime:
+                bundle = None
+                if mtime is not None:
+                    try:
+                        bundle = joblib.load(path)
+                    except Exception:
+                        current_app.logger.exception('Could not load training-time model from %s', path)
+                    if bundle is not None and bundle.get('format_version') != MODEL_FORMAT_VERSION:
+                        current_app.logger.warning('Ignoring training-time model with unsupported format at %s', path)
+                        bundle = None
+                    self.loads += 1
+                self._bundle, self._path, self._mtime = bundle, path, mtime
+            self._checked_at = now
+            return self._bundle
+
+    def info(self):
+        """Describe the loaded model for diagnostics"""
+        bundle = self.get()
+        if bundle is None:
+            return {'loaded': False, 'path': self._path, 'fallback_hours_per_level': TRAINING_HOURS_PER_LEVEL}
+        return {
+            'loaded': True,
+            'path': self._path,
+            'trained_at': bundle['trained_at'],
+            'samples': bundle['samples'],
+            'metrics': bundle['metrics'],
+            'loads': self.loads
+        }
+
+
+model_store = ModelStore()
+
+
+def predict_hours_per_level(skill_ids, skill_categories):
+    """Hours to close one level for each skill, with one predict call over the distinct skills"""
+    skill_ids = np.asarray(skill_ids, dtype=np.int64)
+    bundle = model_store.get()
+    if bundle is None or not len(skill_ids):
+        return np.full(len(skill_ids), float(TRAINING_HOURS_PER_LEVEL))
+
+    unique_ids, first_index, inverse = np.unique(skill_ids, return_index=True, return_inverse=True)
+    features = pd.DataFrame({
+        'skill_id': unique_ids.astype(str),
+        'skill_category': [skill_categories[i] or 'Uncategorized' for i in first_index.tolist()]
+    })
+    hours = np.clip(bundle['pipeline'].predict(features), 1.0, None)
+    return hours[inverse]
+
+
+def predict_training_hours(skill_ids, skill_categories, gap_scores):
+    """Predicted training hours per gap row; zero where the gap is closed"""
+    gap_scores = np.asarray(gap_scores)
+    levels = np.where(gap_scores < 0, -gap_scores, 0)
+    if not levels.any():
+        return np.zeros(len(gap_scores), dtype=np.int64)
+
+    return np.rint(predict_hours_per_level(skill_ids, skill_categories) * levels).astype(np.int64)
+
+
+def factor_tables():
+    """(experience factors, role-level factors): learned values over the defaults"""
+    bundle = model_store.get() or {}
+    return (
+        {**DEFAULT_EXPERIENCE_FACTORS, **bundle.get('experience_factors', {})},
+        {**DEFAULT_ROLE_LEVEL_FACTORS, **bundle.get('role_level_factors', {})}
+    )
+
+
+def adjustment_factors(hire_date, role_level):
+    """(experience_factor, role_level_factor) for an employee, learned when a model is deployed"""
+    experience_factors, role_level_factors = factor_tables()
+    return (
+        experience_factors.get(experience_bucket(hire_date), 1.0),
+        role_level_factors.get(role_level, 1.0)
+    )
+
+
+def success_probabilities(gap_scores):
+    """Chance of closing each gap with training; larger gaps are less certain"""
+    return np.maximum(0.6, 1.0 - np.abs(np.asarray(gap_scores, dtype=np.float64)) * 0.1)
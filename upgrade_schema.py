@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Upgrade an existing database to the current schema.
+
+``db.create_all()`` creates missing tables but never alters existing ones,
+so a database created before change tracking, background jobs and the gap
+history still lacks what those features expect on ``skill_gap_analysis``:
+
+1. the ``job_id`` column (``ALTER TABLE ... ADD COLUMN``) and its index;
+2. the unique (employee_id, skill_id) key the gap upserts rely on for
+   ``ON CONFLICT``. Duplicate pairs are removed first, keeping the newest
+   row (highest id) of each;
+3. the priority/gap_score indexes used by recommendations.
+
+Every step checks the live schema first, so the script is safe to re-run.
+
+Usage:
+    python upgrade_schema.py --dry-run
+    python upgrade_schema.py
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import delete, func, inspect, select, text
+from src.app import create_app, db
+from src.models import SkillGapAnalysis
+
+UNIQUE_PAIR_NAME = 'uq_skill_gap_analysis_employee_skill'
+UNIQUE_PAIR_COLUMNS = ['employee_id', 'skill_id']
+
+
+def _has_unique_pair(inspector, table_name):
+    """Whether a unique constraint or unique index already covers (employee_id, skill_id)"""
+    for constraint in inspector.get_unique_constraints(table_name):
+        if sorted(constraint['column_names']) == UNIQUE_PAIR_COLUMNS:
+            return True
+    return any(
+        index.get('unique') and sorted(index['column_names']) == UNIQUE_PAIR_COLUMNS
+        for index in inspector.get_indexes(table_name)
+    )
+
+
+def upgrade_skill_gap_analysis(dry_run=False):
+    """Bring skill_gap_analysis up to date; return the steps taken (or needed)"""
+    table = SkillGapAnalysis.__table__
+    engine = db.engine
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name):
+        return [f'Create table {table.name}']  # create_all builds it with the full schema
+    steps = []
+
+    if 'job_id' not in {column['name'] for column in inspector.get_columns(table.name)}:
+        column_type = table.c.job_id.type.compile(dialect=engine.dialect)
+        steps.append(f'ALTER TABLE {table.name} ADD COLUMN job_id {column_type}')
+        if not dry_run:
+            db.session.execute(text(steps[-1]))
+
+    if not _has_unique_pair(inspector, table.name):
+        keep = select(func.max(table.c.id)).group_by(table.c.employee_id, table.c.skill_id)
+        duplicates = db.session.execute(
+            select(func.count()).select_from(table).where(table.c.id.not_in(keep))
+        ).scalar()
+        steps.append(f'Delete {duplicates} duplicate (employee_id, skill_id) rows')
+        steps.append(f'CREATE UNIQUE INDEX {UNIQUE_PAIR_NAME} ON {table.name} (employee_id, skill_id)')
+        if not dry_run:
+            db.session.execute(delete(table).where(table.c.id.not_in(keep)))
+            db.session.execute(text(steps[-1]))
+
+    existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+    for index in sorted(table.indexes, key=lambda index: index.name):
+        if index.name not in existing_indexes:
+            steps.append(f"CREATE INDEX {index.name} ON {table.name} ({', '.join(c.name for c in index.columns)})")
+            if not dry_run:
+                index.create(db.session.connection())
+
+    return steps
+
+
+def main():
+    """Parse arguments and upgrade the schema"""
+    parser = argparse.ArgumentParser(description='Upgrade an existing database to the current schema')
+    parser.add_argument('--dry-run', action='store_true', help='Report the needed steps without changing anything')
+    parser.add_argument('--config', default=None, help='Configuration name (development, production, testing)')
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+
+    with app.app_context():
+        if not args.dry_run:
+            db.create_all()  # New tables (change marks, jobs, gap history, entity versions)
+
+        steps = upgrade_skill_gap_analysis(dry_run=args.dry_run)
+        if not args.dry_run:
+            db.session.commit()
+
+    print("=" * 50)
+    print("SCHEMA UPGRADE" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 50)
+    for step in steps or ['Schema is up to date']:
+        print(f"- {step}")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
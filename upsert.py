@@ -0,0 +1,74 @@
+"""
+Dialect-native bulk upserts.
+
+Rows are written as Core ``INSERT ... ON CONFLICT DO UPDATE`` statements in
+fixed-size executemany chunks, so they never pass through the ORM identity
+map. SQLite and PostgreSQL are supported, matching the backends in config.py.
+"""
+from sqlalchemy import select, tuple_
+from src.app import db
+
+
+def dialect_insert(table):
+    """Return an INSERT construct with ON CONFLICT support for the active database"""
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f'Bulk upserts are not supported on {dialect}')
+
+    return insert(table)
+
+
+def chunked(rows, chunk_size):
+    """Yield successive fixed-size slices of rows"""
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+def existing_keys(table, key_columns, rows):
+    """Return the set of key tuples from rows that already exist in table"""
+    if not rows:
+        return set()
+
+    columns = [table.c[name] for name in key_columns]
+    keys = {tuple(row[name] for name in key_columns) for row in rows}
+
+    found = db.session.execute(
+        select(*columns).where(tuple_(*columns).in_(list(keys)))
+    ).all()
+
+    return {tuple(row) for row in found}
+
+
+def upsert_chunk(table, rows, key_columns, update_columns):
+    """Upsert one chunk with a single executemany; return the keys that already existed"""
+    existing = existing_keys(table, key_columns, rows)
+
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: stmt.excluded[name] for name in update_columns}
+    )
+    db.session.execute(stmt, rows)
+
+    return existing
+
+
+def upsert_rows(table, rows, key_columns, update_columns, chunk_size):
+    """Upsert rows in chunks; return (inserted, updated) counts"""
+    inserted = updated = 0
+
+    for chunk in chunked(rows, chunk_size):
+        existing = upsert_chunk(table, chunk, key_columns, update_columns)
+        chunk_updated = sum(
+            1 for row in chunk if tuple(row[name] for name in key_columns) in existing
+        )
+
+        updated += chunk_updated
+        inserted += len(chunk) - chunk_updated
+
+    return inserted, updated
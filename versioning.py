@@ -0,0 +1,108 @@
+"""
+Entity version counters and conditional GET support.
+
+Write paths bump named counters (``skills``, ``employees``,
+``employee:<id>``, ``skill_gaps``, ``skill_matrix``) in the same
+transaction as their data change. GET handlers decorated with ``conditional_get`` derive a strong
+ETag from the counters they depend on plus the request URL, and answer a
+matching ``If-None-Match`` with 304 before the view runs, so an unchanged
+poll costs one small primary-key lookup.
+
+Versions read during a request are remembered in ``g``, so in-process
+caches validated with ``request_versions`` see the same values the ETag
+was built from without another query.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, g, has_request_context, make_response, request
+from sqlalchemy import select
+from src.app import db
+from src.models import EntityVersion
+from src.upsert import dialect_insert
+
+SKILLS = 'skills'
+EMPLOYEES = 'employees'
+SKILL_GAPS = 'skill_gaps'
+GAP_HISTORY = 'gap_history'
+TRAINING_MODEL = 'training_model'
+SKILL_MATRIX = 'skill_matrix'  # Proficiencies, names, departments, roles and requirements behind the skill matrix
+
+
+def employee_entity(employee_id):
+    """Counter name for a single employee's detail and skill profile"""
+    return f'employee:{employee_id}'
+
+
+def bump_versions(*entities):
+    """Increment the counters for entities inside the current transaction"""
+    entities = sorted(set(entities))  # Stable lock order for concurrent writers
+    if not entities:
+        return
+
+    table = EntityVersion.__table__
+    now = datetime.utcnow()
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.entity],
+        set_={'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at}
+    )
+    db.session.execute(stmt, [{'entity': entity, 'version': 1, 'updated_at': now} for entity in entities])
+
+    if has_request_context():
+        for entity in entities:
+            g.get('entity_versions', {}).pop(entity, None)  # Re-read after this request's own write
+
+
+def current_versions(entities):
+    """Return {entity: version} for entities; never-bumped entities report 0"""
+    versions = dict(db.session.execute(
+        select(EntityVersion.entity, EntityVersion.version).where(EntityVersion.entity.in_(entities))
+    ).all())
+    return {entity: versions.get(entity, 0) for entity in entities}
+
+
+def request_versions(entities):
+    """current_versions, read at most once per request and shared with the ETag"""
+    if not has_request_context():
+        return current_versions(entities)
+
+    remembered = g.setdefault('entity_versions', {})
+    missing = [entity for entity in entities if entity not in remembered]
+    if missing:
+        remembered.update(current_versions(missing))
+    return {entity: remembered[entity] for entity in entities}
+
+
+def compute_etag(entities):
+    """Strong ETag over the request URL and the versions of the entities it depends on"""
+    versions = current_versions(entities)
+    g.setdefault('entity_versions', {}).update(versions)
+    tag = '|'.join([request.full_path] + [f'{entity}={versions[entity]}' for entity in sorted(versions)])
+    return hashlib.sha1(tag.encode('utf-8')).hexdigest()
+
+
+def conditional_get(*entities):
+    """Serve 304 Not Modified when If-None-Match matches the entities' current ETag
+
+    Each entity is a counter name or a callable receiving the view's URL
+    arguments, e.g. ``lambda employee_id: employee_entity(employee_id)``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            names = [entity(**kwargs) if callable(entity) else entity for entity in entities]
+            etag = compute_etag(names)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'  # Always revalidate, never serve stale
+            return response
+        return wrapper
+    return decorator